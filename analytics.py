@@ -0,0 +1,137 @@
+import datetime
+import json
+import os
+import sys
+from array import array
+from export import EXPORT_DIR, EPOCH, load_columns
+from outputs import atomic_writer
+from categories import normalize_description
+
+# Pivots over the exported ledger (export/*.bin, see export.py).
+# Every pivot is a group-by on integer keys: the key column is turned into
+# dense codes (dictionary codes for text, day offsets for dates) and the
+# amounts are summed with one bincount pass over the columns. When NumPy is
+# installed every step runs on whole columns (lookup tables indexed by the
+# codes, np.where for the weights, np.bincount); otherwise the same passes run
+# over the stdlib arrays. Rows are never materialized as dicts or objects.
+#
+#   python3 analytics.py   writes export/pivots.json
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def vector(values):
+    # Stdlib array (or ndarray) -> ndarray over the same memory
+    if isinstance(values, np.ndarray):
+        return values
+    return np.frombuffer(values, dtype=np.int64 if values.itemsize == 8 else np.int32)
+
+def bincount(keys, weights, size):
+    # Per key code: (sum of weights, number of rows)
+    if np is not None:
+        codes = vector(keys)
+        sums = np.bincount(codes, weights=vector(weights), minlength=size)
+        counts = np.bincount(codes, minlength=size)
+        return sums.round().astype(np.int64).tolist(), counts.tolist()
+    sums = [0] * size
+    counts = [0] * size
+    for key, weight in zip(keys, weights):
+        sums[key] += weight
+        counts[key] += 1
+    return sums, counts
+
+def pivot(keys, weights, labels):
+    # [{key, total, count}] for every label that has at least one row
+    sums, counts = bincount(keys, weights, len(labels))
+    return [{'key': label, 'total': total, 'count': count}
+            for label, total, count in zip(labels, sums, counts) if count]
+
+def remap(codes, table):
+    # codes -> table[code], e.g. description codes -> merchant codes
+    if np is not None:
+        return np.asarray(table, dtype=np.int64)[vector(codes)]
+    return array('q', map(table.__getitem__, codes))
+
+def encode(values):
+    # Dense codes for arbitrary labels, in first-seen order
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return codes, list(index)
+
+def day_keys(days, bucket):
+    # Date column (days since 1970-01-01) -> codes of bucket(date), computed
+    # once per distinct day in the column's range rather than once per row
+    if not len(days):
+        return array('q'), []
+    if np is not None:
+        days = vector(days)
+        first, last = int(days.min()), int(days.max())
+    else:
+        first, last = min(days), max(days)
+    span = [bucket(EPOCH + datetime.timedelta(days=first + offset)) for offset in range(last - first + 1)]
+    codes, labels = encode(span)
+    if np is not None:
+        return remap(days - first, codes), labels
+    return remap(array('q', (d - first for d in days)), codes), labels
+
+def by_day(date):
+    return date.isoformat()
+
+def by_week(date):
+    # Monday of the week
+    return (date - datetime.timedelta(days=date.weekday())).isoformat()
+
+def by_month(date):
+    return date.strftime('%Y-%m')
+
+def spend_weights(columns, types):
+    # Same basis as "Total Comprometido": the amount for Pix/Debito, the full
+    # purchase for card purchases, nothing for invoice payments
+    use_value = {types.index(t) for t in ('Pix', 'Debito') if t in types}
+    use_total = {types.index(t) for t in ('Credito',) if t in types}
+    if np is not None:
+        codes = vector(columns['type'])
+        return np.where(np.isin(codes, list(use_value)), vector(columns['value']),
+                        np.where(np.isin(codes, list(use_total)), vector(columns['total_purchase_value']), 0))
+    return array('q', (
+        value if code in use_value else total if code in use_total else 0
+        for code, value, total in zip(columns['type'], columns['value'], columns['total_purchase_value'])))
+
+def transaction_pivots(path=os.path.join(EXPORT_DIR, 'transactions.bin')):
+    manifest, columns = load_columns(path)
+    dictionaries = manifest['dictionaries']
+    weights = spend_weights(columns, dictionaries['type'])
+
+    merchant_codes, merchants = encode(map(normalize_description, dictionaries['description']))
+    pivots = {
+        'type': pivot(columns['type'], weights, dictionaries['type']),
+        'category': pivot(columns['category'], weights, dictionaries['category']),
+        'merchant': pivot(remap(columns['description'], merchant_codes), weights, merchants),
+    }
+    for name, bucket in (('day', by_day), ('week', by_week), ('month', by_month)):
+        keys, labels = day_keys(columns['date'], bucket)
+        pivots[name] = pivot(keys, weights, labels)
+    pivots['merchant'].sort(key=lambda row: -row['total'])
+    return pivots
+
+def installment_exposure(path=os.path.join(EXPORT_DIR, 'future_bills.bin')):
+    # Card installments due per month
+    _, columns = load_columns(path)
+    keys, labels = day_keys(columns['due_date'], by_month)
+    return pivot(keys, columns['value'], labels)
+
+def build_pivots(directory=EXPORT_DIR):
+    pivots = transaction_pivots(os.path.join(directory, 'transactions.bin'))
+    future_path = os.path.join(directory, 'future_bills.bin')
+    if os.path.exists(future_path):
+        pivots['installments_by_due_month'] = installment_exposure(future_path)
+    return pivots
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else EXPORT_DIR
+    pivots = build_pivots(directory)
+    with atomic_writer(os.path.join(directory, 'pivots.json'), 'w', encoding='utf-8') as f:
+        json.dump(pivots, f, ensure_ascii=False, indent=2)
+    print(f"Pivots written: {directory}/pivots.json ({', '.join(pivots)})")
@@ -0,0 +1,110 @@
+import bisect
+import math
+from collections import deque
+
+# Online amount statistics for recurring bills.
+# Each payee keeps a Welford accumulator (count, mean and variance in one
+# pass, no stored history) and a rolling window of its last amounts with a
+# sorted copy for the median. A new amount is checked against both before it
+# is added, so flagging costs O(1) per transaction (the window size is fixed)
+# whether the rows come from one export or years of them.
+# A lasting change of amount is flagged once: the payment that raises it
+# starts a new level, and the median window and the accumulator the flags are
+# checked against start over from it. The whole-history stats are kept apart.
+
+WINDOW = 6 # Payments in the rolling median
+MIN_HISTORY = 3 # Payments seen before any flag is raised
+OUTLIER_Z = 3.0 # Standard deviations from the mean
+CHANGE_RATIO = 0.2 # Relative distance from the rolling median
+
+OUTLIER = 'Valor atípico'
+CHANGE = 'Mudança de valor'
+
+class RunningStats:
+    # Welford's algorithm; amounts are integer cents and the exact total is
+    # kept so the mean can be rounded to whole cents without float drift
+    __slots__ = ('count', 'total', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def mean_cents(self):
+        return (2 * self.total + self.count) // (2 * self.count)
+
+    def stddev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+class RollingMedian:
+    # Last `size` amounts in arrival order, plus the same values kept sorted
+    __slots__ = ('size', 'window', 'sorted')
+
+    def __init__(self, size=WINDOW):
+        self.size = size
+        self.window = deque()
+        self.sorted = []
+
+    def add(self, value):
+        self.window.append(value)
+        bisect.insort(self.sorted, value)
+        if len(self.window) > self.size:
+            del self.sorted[bisect.bisect_left(self.sorted, self.window.popleft())]
+
+    def median(self):
+        n = len(self.sorted)
+        mid = n // 2
+        return self.sorted[mid] if n % 2 else (self.sorted[mid - 1] + self.sorted[mid]) / 2
+
+class PayeeMonitor:
+    # Feed payments in date order; observe() returns the flags raised by the
+    # payment (compared with what was seen before it), then records it.
+    # stats: whole history per payee; levels/medians: since its last change
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.stats = {}
+        self.levels = {}
+        self.medians = {}
+        self.flags = {}
+
+    def observe(self, payee, date, amount):
+        stats = self.stats.get(payee)
+        if stats is None:
+            stats = self.stats[payee] = RunningStats()
+            self.levels[payee] = RunningStats()
+            self.medians[payee] = RollingMedian(self.window)
+            self.flags[payee] = []
+        level = self.levels[payee]
+        rolling = self.medians[payee]
+
+        raised = []
+        if level.count >= MIN_HISTORY:
+            stddev = level.stddev()
+            if stddev and abs(amount - level.mean) > OUTLIER_Z * stddev:
+                raised.append(OUTLIER)
+            median = rolling.median()
+            if median and abs(amount - median) > CHANGE_RATIO * median:
+                raised.append(CHANGE)
+        if raised:
+            self.flags[payee].append({'date': date, 'amount': amount, 'flags': raised,
+                                      'expected': level.mean_cents()})
+        if CHANGE in raised:
+            level = self.levels[payee] = RunningStats()
+            rolling = self.medians[payee] = RollingMedian(self.window)
+
+        stats.add(amount)
+        level.add(amount)
+        rolling.add(amount)
+        return raised
@@ -0,0 +1,248 @@
+import base64
+import bisect
+import datetime
+import heapq
+import json
+import os
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from money import to_units
+from export import EXPORT_DIR, read_ndjson
+
+# Local JSON API over the exported ledger (see export.py).
+# The data is loaded once and indexed in memory: transactions by date (for
+# range queries, via bisect), by type and by lower-cased description. Each
+# distinct filter/sort combination is computed once and kept in an LRU cache;
+# pages are then cut from it with a cursor, so paging costs O(log n + limit).
+# Everything else (the HTML reports, assets/) is served as static files, so
+# the reports can fetch from the same origin.
+#
+#   /transactions?from=2026-01-01&to=2026-01-31&type=Pix,Debito&exclude=...&q=posto&sort=value&order=desc&limit=50&cursor=...
+#   /future-bills?month=2026-03
+#   /aggregate?by=type|category|month|day (same filters as /transactions)
+#   /future-bills/totals
+
+HOST = '127.0.0.1'
+PORT = 8000
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+QUERY_CACHE_SIZE = 256
+
+SORT_FIELDS = ('date', 'description', 'type', 'category', 'status', 'value', 'total_purchase_value')
+AGGREGATE_KEYS = {
+    'type': lambda t: t['type'],
+    'category': lambda t: t['category'],
+    'month': lambda t: t['date'].strftime('%Y-%m'),
+    'day': lambda t: t['date'].isoformat(),
+}
+
+class QueryError(ValueError):
+    pass
+
+def parse_day(value, name):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f"'{name}' must be a YYYY-MM-DD date")
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        value, position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise QueryError("Invalid cursor")
+    if not isinstance(position, int):
+        raise QueryError("Invalid cursor")
+    return value, position
+
+def transaction_view(t):
+    # Same shape as the data embedded in relatorio_viagem.html
+    return {
+        'date': t['date'].isoformat(),
+        'display_date': t['date'].strftime('%d/%m/%Y'),
+        'description': t['description'],
+        'value': to_units(t['value']),
+        'total_purchase_value': to_units(t['total_purchase_value']),
+        'type': t['type'],
+        'status': t['status'],
+        'category': t['category'],
+    }
+
+def future_bill_view(row):
+    return {
+        'purchase_date': row['purchase_date'].strftime('%d/%m/%Y'),
+        'description': row['description'],
+        'value': to_units(row['value']),
+        'due_date': row['due_date'].isoformat(),
+        'installment_info': row['installment_info'],
+        'total_purchase': to_units(row['total_purchase']),
+        'amount_paid': to_units(row['amount_paid']),
+        'amount_remaining': to_units(row['amount_remaining']),
+    }
+
+class Ledger:
+    def __init__(self, directory=EXPORT_DIR):
+        self.transactions = sorted(read_ndjson(os.path.join(directory, 'transactions.ndjson'), dates=('date',)),
+                                   key=lambda t: t['date'])
+        self.dates = [t['date'] for t in self.transactions]
+        self.by_type = defaultdict(list)
+        for i, t in enumerate(self.transactions):
+            self.by_type[t['type']].append(i)
+        self.search_text = [t['description'].lower() for t in self.transactions]
+
+        self.bills_by_month = defaultdict(list)
+        path = os.path.join(directory, 'future_bills.ndjson')
+        if os.path.exists(path):
+            for row in read_ndjson(path, dates=('purchase_date', 'due_date')):
+                self.bills_by_month[row['due_date'].strftime('%Y-%m')].append(row)
+
+        self.matching = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._matching)
+        self.aggregate = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._aggregate)
+
+    def sort_value(self, i, field):
+        value = self.transactions[i][field]
+        if field == 'date':
+            return value.toordinal()
+        if isinstance(value, str):
+            return value.lower()
+        return value
+
+    def _filtered(self, date_from, date_to, types, excluded, text):
+        # Positions (in date order) matching every filter
+        lo = bisect.bisect_left(self.dates, date_from) if date_from else 0
+        hi = bisect.bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        if types:
+            slices = []
+            for tx_type in types:
+                ids = self.by_type.get(tx_type, [])
+                slices.append(ids[bisect.bisect_left(ids, lo):bisect.bisect_left(ids, hi)])
+            ids = list(heapq.merge(*slices))
+        else:
+            ids = range(lo, hi)
+        if excluded:
+            ids = [i for i in ids if self.transactions[i]['type'] not in excluded]
+        if text:
+            text = text.lower()
+            ids = [i for i in ids if text in self.search_text[i]]
+        return ids
+
+    def _matching(self, date_from, date_to, types, excluded, text, sort):
+        # Sorted (sort value, position) keys; the position breaks ties so
+        # every key, and therefore every cursor, is unique. Positions are in
+        # date order, so sorting by date is a single already-sorted run.
+        return sorted((self.sort_value(i, sort), i) for i in self._filtered(date_from, date_to, types, excluded, text))
+
+    def page(self, filters, sort, descending, limit, cursor):
+        keys = self.matching(*filters, sort)
+        if cursor and not isinstance(cursor[0], type(keys[0][0]) if keys else object):
+            raise QueryError("Cursor does not match this sort")
+        if descending:
+            end = bisect.bisect_left(keys, cursor) if cursor else len(keys)
+            start = max(end - limit, 0)
+            chunk = keys[start:end][::-1]
+            more = start > 0
+        else:
+            start = bisect.bisect_right(keys, cursor) if cursor else 0
+            chunk = keys[start:start + limit]
+            more = start + limit < len(keys)
+        return {
+            'total': len(keys),
+            'items': [transaction_view(self.transactions[i]) for _, i in chunk],
+            'next_cursor': encode_cursor(chunk[-1]) if more and chunk else None,
+        }
+
+    def _aggregate(self, by, filters):
+        key = AGGREGATE_KEYS[by]
+        groups = {}
+        for i in self._filtered(*filters):
+            t = self.transactions[i]
+            group = groups.setdefault(key(t), [0, 0, 0])
+            group[0] += 1
+            group[1] += t['value']
+            group[2] += t['total_purchase_value']
+        return [{by: name, 'count': count, 'value': to_units(value), 'total_purchase_value': to_units(total)}
+                for name, (count, value, total) in sorted(groups.items())]
+
+    def future_bills(self, month):
+        return [future_bill_view(row) for row in self.bills_by_month.get(month, [])]
+
+    def future_totals(self):
+        return [{'month': month, 'count': len(rows), 'value': to_units(sum(row['value'] for row in rows))}
+                for month, rows in sorted(self.bills_by_month.items())]
+
+class ApiHandler(SimpleHTTPRequestHandler):
+    ledger = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = self.routes.get(url.path.rstrip('/'))
+        if route is None:
+            return super().do_GET()
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            self.send_json(200, route(self, params))
+        except QueryError as e:
+            self.send_json(400, {'error': str(e)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def filters(self, params):
+        # Hashable, so each combination can be an LRU cache key
+        return (
+            parse_day(params['from'], 'from') if params.get('from') else None,
+            parse_day(params['to'], 'to') if params.get('to') else None,
+            frozenset(filter(None, params.get('type', '').split(','))),
+            frozenset(filter(None, params.get('exclude', '').split(','))),
+            params.get('q') or None,
+        )
+
+    def get_transactions(self, params):
+        sort = params.get('sort', 'date')
+        if sort not in SORT_FIELDS:
+            raise QueryError(f"'sort' must be one of: {', '.join(SORT_FIELDS)}")
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            raise QueryError("'limit' must be a number")
+        cursor = decode_cursor(params['cursor']) if params.get('cursor') else None
+        return self.ledger.page(self.filters(params), sort, params.get('order') == 'desc', limit, cursor)
+
+    def get_aggregate(self, params):
+        by = params.get('by', 'type')
+        if by not in AGGREGATE_KEYS:
+            raise QueryError(f"'by' must be one of: {', '.join(AGGREGATE_KEYS)}")
+        return self.ledger.aggregate(by, self.filters(params))
+
+    def get_future_bills(self, params):
+        month = params.get('month')
+        if not month:
+            raise QueryError("'month' is required (YYYY-MM)")
+        return self.ledger.future_bills(month)
+
+    def get_future_totals(self, params):
+        return self.ledger.future_totals()
+
+    routes = {
+        '/transactions': get_transactions,
+        '/aggregate': get_aggregate,
+        '/future-bills': get_future_bills,
+        '/future-bills/totals': get_future_totals,
+    }
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    ApiHandler.ledger = Ledger()
+    print(f"Loaded {len(ApiHandler.ledger.transactions)} transactions")
+    print(f"Serving on http://{HOST}:{port}")
+    ThreadingHTTPServer((HOST, port), ApiHandler).serve_forever()
@@ -0,0 +1,41 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from outputs import write_if_changed
+
+# Shared CSS/JS for the report pages.
+# Sources live in static/; each build publishes them as assets/<name>.<hash>.<ext>
+# so browsers and the static host can cache them forever, and the pages only
+# carry their own data and markup.
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+ASSETS_DIR = 'assets'
+
+@lru_cache(maxsize=None)
+def asset_url(name):
+    with open(os.path.join(STATIC_DIR, name), 'r', encoding='utf-8') as f:
+        content = f.read()
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    stem, ext = os.path.splitext(name)
+    hashed_name = f"{stem}.{digest}{ext}"
+
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    write_if_changed(os.path.join(ASSETS_DIR, hashed_name), content)
+
+    # Drop older builds of the same asset
+    stale = re.compile(re.escape(stem) + r'\.[0-9a-f]{10}' + re.escape(ext) + '$')
+    for filename in os.listdir(ASSETS_DIR):
+        if filename != hashed_name and stale.match(filename):
+            try:
+                os.remove(os.path.join(ASSETS_DIR, filename))
+            except FileNotFoundError:
+                pass
+
+    return f"{ASSETS_DIR}/{hashed_name}"
+
+def stylesheets(*names):
+    return '\n    '.join(f'<link rel="stylesheet" href="{asset_url(name)}">' for name in names)
+
+def scripts(*names):
+    return '\n'.join(f'<script src="{asset_url(name)}"></script>' for name in names)
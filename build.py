@@ -0,0 +1,21 @@
+import os
+import runpy
+from concurrent.futures import ProcessPoolExecutor
+
+# Runs every report generator in its own process. Each script writes its
+# pages atomically and skips pages whose bytes did not change.
+# The cash-flow timeline, the pivots and the change report read the other
+# scripts' exports, so they run last.
+
+SCRIPTS = ['parse_expenses.py', 'parse_fixed_bills.py', 'parse_savings.py']
+DEPENDENT_SCRIPTS = ['parse_timeline.py', 'analytics.py', 'changes.py']
+
+def run_script(filename):
+    runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), filename), run_name='__main__')
+    return filename
+
+if __name__ == '__main__':
+    with ProcessPoolExecutor(max_workers=len(SCRIPTS)) as pool:
+        list(pool.map(run_script, SCRIPTS))
+    for filename in DEPENDENT_SCRIPTS:
+        run_script(filename)
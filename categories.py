@@ -0,0 +1,123 @@
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+# Merchant categorization.
+# Keywords from categories.json are compiled once into an Aho-Corasick
+# automaton, so a description is matched against every keyword in a single
+# pass (whole words only, see KeywordAutomaton). Normalization and
+# categorization are memoized because the same merchants repeat over and over
+# in the statements.
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'categories.json')
+DEFAULT_CATEGORY = 'Outros'
+
+installment_suffix = re.compile(r'-\s*\d+/\d+')
+installment_any = re.compile(r'(?:-\s*)?\b\d{1,2}/\d{1,2}\b')
+leading_document = re.compile(r'^\d+\s+')
+camel_case = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+
+@lru_cache(maxsize=4096)
+def collapse_whitespace(desc):
+    return ' '.join(desc.split())
+
+@lru_cache(maxsize=4096)
+def strip_installment(desc):
+    # "LOJA X - 01/03 ANAPOLIS" -> "LOJA X ANAPOLIS"
+    return installment_suffix.sub('', desc).strip()
+
+@lru_cache(maxsize=4096)
+def normalize_description(desc):
+    # Merchant key: no installment marker ("- 1/3" or "01/03"), no leading
+    # document number, single spaces, upper case.
+    desc = installment_any.sub('', desc)
+    return leading_document.sub('', collapse_whitespace(desc).upper())
+
+class KeywordAutomaton:
+    # Keywords only match whole words: an alphanumeric first/last character
+    # must not touch another alphanumeric one in the text ("HOPE" does not
+    # match "HOPEFUL"). Keywords whose edge is a space or punctuation
+    # ("POSTO ") carry their own boundary. A "*" drops the boundary on its
+    # side, for stems and for names that statements glue to other words:
+    # "SUPERMER*" matches "SUPERMERCADO", "*FARMACIA" matches "PAYGOFARMACIA".
+    def __init__(self, keywords):
+        # keywords: [(keyword, priority)]; lower priority wins on overlap
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]] # (length, priority, needs start boundary, needs end boundary)
+        self.link = [0] # Nearest node on the failure chain with outputs
+        for keyword, priority in keywords:
+            open_start = keyword.startswith('*')
+            open_end = keyword.endswith('*')
+            keyword = keyword.strip('*')
+            if not keyword:
+                continue
+            node = 0
+            for ch in keyword:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.link.append(0)
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.out[node].append((len(keyword), priority, keyword[0].isalnum() and not open_start,
+                                   keyword[-1].isalnum() and not open_end))
+
+        # Breadth-first failure links; output links skip straight to the next
+        # node (on the failure chain) where some keyword ends.
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                target = self.fail[child]
+                self.link[child] = target if self.out[target] else self.link[target]
+                queue.append(child)
+
+    def search(self, text):
+        goto, fail, out, link = self.goto, self.fail, self.out, self.link
+        last = len(text) - 1
+        node = 0
+        best = None
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found = node if out[node] else link[node]
+            while found:
+                for length, priority, needs_start, needs_end in out[found]:
+                    if best is not None and priority >= best:
+                        continue
+                    start = pos - length + 1
+                    if needs_start and start > 0 and text[start - 1].isalnum():
+                        continue
+                    if needs_end and pos < last and text[pos + 1].isalnum():
+                        continue
+                    best = priority
+                found = link[found]
+        return best
+
+def load_rules(path=RULES_FILE):
+    # {"Categoria": ["KEYWORD", ...]}, earlier categories win
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+    except FileNotFoundError:
+        return [], KeywordAutomaton([])
+    names = list(rules)
+    keywords = [(keyword.upper(), i) for i, name in enumerate(names) for keyword in rules[name]]
+    return names, KeywordAutomaton(keywords)
+
+category_names, automaton = load_rules()
+
+@lru_cache(maxsize=4096)
+def categorize(desc):
+    # Glued CamelCase names are split first: "DrogariaModelo" -> "Drogaria Modelo"
+    found = automaton.search(normalize_description(camel_case.sub(' ', desc)))
+    return DEFAULT_CATEGORY if found is None else category_names[found]
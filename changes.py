@@ -0,0 +1,111 @@
+import os
+import sys
+from money import format_cents
+from export import EXPORT_DIR, read_ndjson
+from outputs import atomic_writer
+from categories import normalize_description
+
+# What changed since the previous build.
+# Every build reduces its exports to a sorted list of fingerprints
+# (kind, date, cents, normalized description, source) and stores it. The next
+# build walks the stored list and the new one together (a linear merge of two
+# sorted lists), so the report costs O(n) and its length is proportional to
+# the change, not to the history. A row whose amount changed shows up as a
+# removal plus an addition with the same key and is reported as revised.
+
+FINGERPRINT_FILE = 'fingerprints.tsv'
+CHANGES_FILE = 'changes.md'
+
+def ledger_fingerprints(directory=EXPORT_DIR):
+    # Dates stay as ISO strings, which sort like the dates themselves
+    def exported(name):
+        path = os.path.join(directory, f"{name}.ndjson")
+        return read_ndjson(path) if os.path.exists(path) else ()
+
+    for t in exported('transactions'):
+        yield ('Lançamento', t['date'], t['value'], normalize_description(t['description']), t.get('source', ''))
+    for row in exported('future_bills'):
+        yield ('Parcela', row['due_date'], row['value'],
+               f"{normalize_description(row['description'])} {row['installment_info']}", 'sicoob_futuros')
+    for row in exported('savings_balances'):
+        yield ('Poupança', row['period_end'], row['end'], f"{row['type']} {row['account']}", row['file'])
+
+def save_fingerprints(path, fingerprints):
+    with atomic_writer(path, 'w', encoding='utf-8') as f:
+        for kind, date, cents, description, source in fingerprints:
+            f.write(f"{kind}\t{date}\t{cents}\t{description}\t{source}\n")
+
+def load_fingerprints(path):
+    fingerprints = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            kind, date, cents, description, source = line.rstrip('\n').split('\t')
+            fingerprints.append((kind, date, int(cents), description, source))
+    return fingerprints
+
+def diff_sorted(old, new):
+    # Linear merge of two sorted lists (duplicates allowed) -> (removed, added)
+    removed, added = [], []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            removed.append(old[i])
+            i += 1
+        else:
+            added.append(new[j])
+            j += 1
+    removed.extend(old[i:])
+    added.extend(new[j:])
+    return removed, added
+
+def pair_revisions(removed, added):
+    # Same kind, date, description and source, different amount
+    def key(fingerprint):
+        kind, date, _, description, source = fingerprint
+        return (kind, date, description, source)
+
+    pending = {}
+    for fingerprint in removed:
+        pending.setdefault(key(fingerprint), []).append(fingerprint)
+    revised, new_only = [], []
+    for fingerprint in added:
+        olds = pending.get(key(fingerprint))
+        if olds:
+            revised.append((olds.pop(), fingerprint))
+        else:
+            new_only.append(fingerprint)
+    removed_only = [fingerprint for olds in pending.values() for fingerprint in olds]
+    removed_only.sort()
+    return removed_only, new_only, revised
+
+def describe(fingerprint):
+    kind, date, cents, description, source = fingerprint
+    return f"{kind} {date} {format_cents(cents)} {description} ({source})"
+
+def render_changes(removed, added, revised):
+    lines = ["# Mudanças desde a última geração", "",
+             f"{len(added)} novos, {len(removed)} removidos, {len(revised)} alterados", ""]
+    if added:
+        lines += ["## Novos", ""] + [f"- {describe(f)}" for f in added] + [""]
+    if revised:
+        lines += ["## Alterados", ""] + [f"- {describe(new)} (antes: {format_cents(old[2])})" for old, new in revised] + [""]
+    if removed:
+        lines += ["## Removidos", ""] + [f"- {describe(f)}" for f in removed] + [""]
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else EXPORT_DIR
+    state_path = os.path.join(directory, FINGERPRINT_FILE)
+    current = sorted(ledger_fingerprints(directory))
+
+    if os.path.exists(state_path):
+        removed, added, revised = pair_revisions(*diff_sorted(load_fingerprints(state_path), current))
+        with atomic_writer(os.path.join(directory, CHANGES_FILE), 'w', encoding='utf-8') as f:
+            f.write(render_changes(removed, added, revised))
+        print(f"Changes: {len(added)} new, {len(removed)} removed, {len(revised)} revised ({directory}/{CHANGES_FILE})")
+    else:
+        print(f"Changes: no previous build, saving {len(current)} fingerprints as the baseline")
+    save_fingerprints(state_path, current)
@@ -0,0 +1,126 @@
+import datetime
+import json
+import os
+import sys
+from array import array
+from outputs import atomic_writer
+
+# Export of the parsed ledger, so other tools don't have to re-run the regex
+# parsers or scrape the HTML. Every dataset is written twice:
+#   export/<name>.ndjson     one JSON object per line, streamed from a generator
+#   export/<name>.bin/.json  columnar binary + manifest; each column is a
+#                            contiguous little-endian array that can be mapped
+#                            with np.memmap(path, dtype, offset=..., shape=(rows,))
+# Amounts are integer cents, dates are days since 1970-01-01 in the binary
+# file (numpy 'datetime64[D]') and ISO strings in NDJSON. Text columns are
+# dictionary-encoded: int32 codes in the binary, values in the manifest.
+
+EXPORT_DIR = 'export'
+EPOCH = datetime.date(1970, 1, 1)
+
+# Column kinds -> (array typecode, numpy dtype)
+COLUMN_TYPES = {
+    'int': ('q', '<i8'),
+    'date': ('q', '<M8[D]'),
+    'str': ('i', '<i4'),
+}
+
+def json_default(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+def write_ndjson(path, rows):
+    count = 0
+    with atomic_writer(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, default=json_default))
+            f.write('\n')
+            count += 1
+    return count
+
+def write_columns(path, schema, rows):
+    # schema: [(column name, 'int' | 'date' | 'str')]
+    columns = {name: array(COLUMN_TYPES[kind][0]) for name, kind in schema}
+    dictionaries = {name: {} for name, kind in schema if kind == 'str'}
+    appends = [(columns[name].append, kind, dictionaries.get(name)) for name, kind in schema]
+    names = [name for name, _ in schema]
+
+    count = 0
+    for row in rows:
+        for name, (append, kind, dictionary) in zip(names, appends):
+            value = row[name]
+            if kind == 'date':
+                append((value - EPOCH).days)
+            elif kind == 'str':
+                append(dictionary.setdefault(value, len(dictionary)))
+            else:
+                append(value)
+        count += 1
+
+    manifest = {'rows': count, 'columns': [], 'dictionaries': {}}
+    with atomic_writer(path) as f:
+        for name, kind in schema:
+            column = columns[name]
+            # Keep every column 8-byte aligned
+            f.write(b'\0' * (-f.tell() % 8))
+            manifest['columns'].append({'name': name, 'dtype': COLUMN_TYPES[kind][1], 'offset': f.tell()})
+            if sys.byteorder == 'big':
+                column.byteswap()
+            column.tofile(f)
+            if kind == 'str':
+                manifest['dictionaries'][name] = list(dictionaries[name])
+
+    with atomic_writer(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return count
+
+def export_dataset(name, rows_factory, schema, directory=EXPORT_DIR):
+    # rows_factory returns a fresh iterator on each call (one per format)
+    os.makedirs(directory, exist_ok=True)
+    count = write_ndjson(os.path.join(directory, f"{name}.ndjson"), rows_factory())
+    write_columns(os.path.join(directory, f"{name}.bin"), schema, rows_factory())
+    print(f"Exported {count} rows: {directory}/{name}.ndjson, {directory}/{name}.bin")
+    return count
+
+def read_ndjson(path, dates=()):
+    # Streams the rows back; the fields named in dates are parsed to datetime.date
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            for field in dates:
+                row[field] = datetime.date.fromisoformat(row[field])
+            yield row
+
+def read_manifest(path):
+    with open(os.path.splitext(path)[0] + '.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_columns(path):
+    # Stdlib reader: {column name: array}. Text columns stay as codes; see
+    # manifest['dictionaries'] for their values.
+    manifest = read_manifest(path)
+    typecodes = {dtype: typecode for typecode, dtype in COLUMN_TYPES.values()}
+    columns = {}
+    with open(path, 'rb') as f:
+        for column in manifest['columns']:
+            values = array(typecodes[column['dtype']])
+            f.seek(column['offset'])
+            values.fromfile(f, manifest['rows'])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            columns[column['name']] = values
+    return manifest, columns
+
+def memmap_columns(path):
+    # Zero-copy access for NumPy users (NumPy is not needed for anything else)
+    import numpy as np
+    manifest = read_manifest(path)
+    if manifest['rows'] == 0:
+        # np.memmap can't map an empty file
+        return manifest, {column['name']: np.empty(0, np.dtype(column['dtype'])) for column in manifest['columns']}
+    return manifest, {
+        column['name']: np.memmap(path, dtype=np.dtype(column['dtype']), mode='r',
+                                  offset=column['offset'], shape=(manifest['rows'],))
+        for column in manifest['columns']
+    }
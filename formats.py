@@ -0,0 +1,84 @@
+import os
+import re
+import sys
+from collections import defaultdict
+
+# Statement format registry.
+# Each format registers a sniffing function that only looks at the first few KB
+# of a file, so a whole input directory can be routed to the right parsers in
+# one scan, without trial-parsing anything.
+
+SNIFF_BYTES = 4096
+INPUT_EXTENSIONS = ('.txt', '.csv')
+
+_formats = []  # (name, sniff) in priority order, most specific first
+
+def register_format(name):
+    def decorator(sniff):
+        _formats.append((name, sniff))
+        return sniff
+    return decorator
+
+def read_head(path, size=SNIFF_BYTES):
+    with open(path, 'rb') as f:
+        return f.read(size).decode('utf-8', errors='ignore')
+
+def detect_format(path):
+    try:
+        head = read_head(path)
+    except OSError:
+        return None
+    for name, sniff in _formats:
+        if sniff(path, head):
+            return name
+    return None
+
+def route_directory(directory='.', extensions=INPUT_EXTENSIONS):
+    routed = defaultdict(list)
+    if not os.path.isdir(directory):
+        return routed
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(extensions):
+            continue
+        path = os.path.join(directory, filename)
+        name = detect_format(path)
+        if name:
+            routed[name].append(path)
+    return routed
+
+# --- Sniffers ---
+
+@register_format('sicoob_futuros')
+def sniff_sicoob_futuros(path, head):
+    upper = head.upper()
+    return ("LANÇAMENTOS FUTUROS" in upper
+            or "MOVIMENTOS PARA A PRÓXIMA FATURA" in upper
+            or "PARCELADOS COM VENCIMENTO FUTURO" in upper)
+
+@register_format('sicoob_cartao')
+def sniff_sicoob_cartao(path, head):
+    return "GASTOS DE" in head
+
+_sicoob_conta_line = re.compile(r'^\d{2}/\d{2}\s+.*R\$\s?[\d\.,]+[DC]\s*$', re.MULTILINE)
+
+@register_format('sicoob_conta')
+def sniff_sicoob_conta(path, head):
+    return "SALDO DO DIA" in head or _sicoob_conta_line.search(head) is not None
+
+_scotia_account_line = re.compile(r'#\d+\s+SSI\s+[A-Z]+')
+
+@register_format('scotia_savings')
+def sniff_scotia_savings(path, head):
+    return _scotia_account_line.search(head) is not None
+
+_rbc_csv_row = re.compile(r'^\d{4}-\d{2}-\d{2},')
+
+@register_format('rbc_csv')
+def sniff_rbc_csv(path, head):
+    return path.endswith('.csv') and _rbc_csv_row.match(head) is not None
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else '.'
+    for name, paths in sorted(route_directory(directory).items()):
+        for path in paths:
+            print(f"{name:16} {path}")
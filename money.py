@@ -0,0 +1,32 @@
+# Money is stored as integer cents everywhere; it is only turned back into a
+# decimal number when a report is rendered.
+
+def brl_to_cents(val_str):
+    # Sicoob format: "R$ 1.234,56D", "1.234,56", "R$ -5,00"
+    clean = val_str.replace('R$', '').replace('.', '').replace('-', '').strip()
+    if clean.endswith('D') or clean.endswith('C'):
+        clean = clean[:-1]
+    units, _, frac = clean.partition(',')
+    cents = int(units or 0) * 100 + int((frac + '00')[:2])
+    return -cents if '-' in val_str else cents
+
+def decimal_to_cents(val_str):
+    # Dot-decimal format used by the RBC CSV and Scotia PDFs: "18.06", "10,008.28"
+    clean = val_str.replace(',', '').strip()
+    negative = clean.startswith('-')
+    units, _, frac = clean.lstrip('-').partition('.')
+    cents = int(units or 0) * 100 + int((frac + '00')[:2])
+    return -cents if negative else cents
+
+def to_units(cents):
+    # For JSON / data-val attributes read by the page scripts
+    return cents / 100
+
+def format_cents(cents):
+    # Same output as f"{value:,.2f}"
+    sign = '-' if cents < 0 else ''
+    units, frac = divmod(abs(cents), 100)
+    return f"{sign}{units:,}.{frac:02d}"
+
+def format_brl(cents):
+    return "R$ " + format_cents(cents).replace('.', 'X').replace(',', '.').replace('X', ',')
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+@contextmanager
+def atomic_writer(path, mode='wb', encoding=None):
+    # Writes go to a temp file next to the target, which is os.replace'd into
+    # place on success, so readers (e.g. a static server) never see a
+    # half-written file.
+    try:
+        file_mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        file_mode = 0o644
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, file_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def write_if_changed(path, content, encoding='utf-8'):
+    # Files whose bytes did not change are left untouched
+    data = content.encode(encoding)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    with atomic_writer(path) as f:
+        f.write(data)
+    return True
+
+def write_reports(renderers, max_workers=None):
+    # renderers: {output_path: function returning the page text}
+    # Pages only read the already-parsed data, so they can render concurrently.
+    def render_and_write(item):
+        path, render = item
+        return path, write_if_changed(path, render())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for path, changed in pool.map(render_and_write, renderers.items()):
+            print(f"Report generated: {path}" if changed else f"Report unchanged: {path}")
@@ -1,14 +1,29 @@
 import re
 import json
+import heapq
 import datetime
 from collections import defaultdict
+from money import brl_to_cents, to_units, format_cents, format_brl
+from formats import route_directory
+from outputs import write_reports
+from export import EXPORT_DIR, export_dataset
+from analytics import build_pivots
+from assets import stylesheets, scripts
+from categories import categorize, collapse_whitespace, strip_installment
+from reconcile import DUE_DAY, RECONCILED, OPEN, cycle_due_date, billing_cycles, merge_cycles, reconcile
 
 # Configuration
 TRIP_START = datetime.date(2025, 12, 26)
 TRIP_END = datetime.date(2026, 1, 28)
+INPUT_DIR = '.'
+FUTURE_DETAIL_MONTHS = None # Only the first N due months get itemized rows in relatorio_futuro.html (None = all)
+EMBED_TRANSACTIONS = True # False: relatorio_viagem.html fetches the table page by page from api.py
 
 class Transaction:
-    def __init__(self, date, description, value, type, original_line, total_purchase_value=None):
+    # Amounts are integer cents
+    __slots__ = ('date', 'description', 'value', 'type', 'original_line', 'status', 'total_purchase_value', 'category', 'source', 'card', 'invoice_due')
+
+    def __init__(self, date, description, value, type, original_line, total_purchase_value=None, card=None, invoice_due=None):
         self.date = date
         self.description = description
         self.value = value
@@ -16,27 +31,153 @@ class Transaction:
         self.original_line = original_line
         self.status = 'Pago' if type in ['Pix', 'Debito'] else 'Credito'
         self.total_purchase_value = total_purchase_value if total_purchase_value is not None else value
+        self.category = categorize(description)
+        self.source = None # Statement format it came from (see formats.py)
+        self.card = card # Card id (see card_id), when the statement names the card
+        self.invoice_due = invoice_due # Due date of the card invoice that bills it
 
     def to_dict(self):
         return {
             'date': self.date.strftime('%Y-%m-%d'),
             'display_date': self.date.strftime('%d/%m/%Y'),
             'description': self.description,
+            'value': to_units(self.value),
+            'total_purchase_value': to_units(self.total_purchase_value),
+            'type': self.type,
+            'status': self.status,
+            'category': self.category,
+            'original_line': self.original_line
+        }
+
+    def to_record(self):
+        # Export form: real dates, amounts in cents
+        return {
+            'date': self.date,
+            'description': self.description,
             'value': self.value,
             'total_purchase_value': self.total_purchase_value,
             'type': self.type,
             'status': self.status,
+            'category': self.category,
+            'card': card_numbers[self.card] if self.card is not None else '',
+            'source': self.source,
             'original_line': self.original_line
         }
 
-transactions = []
-future_bills = [] 
+def month_index(date):
+    return date.year * 12 + date.month - 1
+
+# Cards (last 4 digits) are interned as small ints: card_numbers[id] -> '9329'
+card_numbers = []
+card_index = {}
+
+def card_id(number):
+    if number not in card_index:
+        card_index[number] = len(card_numbers)
+        card_numbers.append(number)
+    return card_index[number]
+
+class InstallmentPlan:
+    # A card purchase and its remaining installments. Rows are built on demand,
+    # so memory grows with the number of purchases, not purchases x installments.
+    __slots__ = ('purchase_date', 'description', 'value', 'first_due', 'start_inst', 'total_inst', 'card')
+
+    def __init__(self, purchase_date, description, value, first_due, start_inst=1, total_inst=1, card=None):
+        self.purchase_date = purchase_date
+        self.description = description
+        self.value = value
+        self.first_due = first_due
+        self.start_inst = start_inst
+        self.total_inst = total_inst
+        self.card = card
+
+    @property
+    def remaining_count(self):
+        return self.total_inst - self.start_inst + 1
+
+    def row(self, i):
+        current_due_date = add_months(self.first_due, i)
+        current_inst_num = self.start_inst + i
+        total_purchase = self.value * self.total_inst
+        return {
+            'purchase_date': self.purchase_date.strftime('%d/%m/%Y'),
+            'description': self.description,
+            'value': self.value,
+            'due_date': current_due_date,
+            'due_month': current_due_date.strftime('%B %Y'),
+            'installment_info': f"{current_inst_num}/{self.total_inst}",
+            'total_purchase': total_purchase,
+            'amount_paid': (current_inst_num - 1) * self.value,
+            # Amount remaining is total purchase MINUS all installments UP TO and INCLUDING the current one
+            'amount_remaining': total_purchase - (current_inst_num * self.value)
+        }
+
+    def row_for_month(self, index):
+        i = index - month_index(self.first_due)
+        if 0 <= i < self.remaining_count:
+            return self.row(i)
+        return None
+
+    def rows(self):
+        for i in range(self.remaining_count):
+            yield self.row(i)
+
+    def records(self):
+        # Export form: real dates, amounts in cents
+        for row in self.rows():
+            row['purchase_date'] = self.purchase_date
+            row['card'] = card_numbers[self.card] if self.card is not None else ''
+            del row['due_month']
+            yield row
+
+class FutureBills:
+    # Lazy view over all installment plans: rows are built per month on
+    # demand and totals come straight from the plans. Plans are also
+    # partitioned by card as they are added.
+    def __init__(self):
+        self.plans = []
+        self.by_card = defaultdict(list)
+
+    def add(self, plan):
+        self.plans.append(plan)
+        self.by_card[plan.card].append(plan)
+
+    def month_sums(self, card=None):
+        # Difference array over month indexes: O(plans + months), over every
+        # plan or only one card's. (year, month) -> (total, installments due)
+        delta = defaultdict(lambda: [0, 0])
+        for plan in (self.plans if card is None else self.by_card.get(card, [])):
+            start = month_index(plan.first_due)
+            end = start + plan.remaining_count
+            delta[start][0] += plan.value
+            delta[start][1] += 1
+            delta[end][0] -= plan.value
+            delta[end][1] -= 1
+        sums = {}
+        total = count = 0
+        indexes = sorted(delta)
+        for index, next_index in zip(indexes, indexes[1:]):
+            total += delta[index][0]
+            count += delta[index][1]
+            if count:
+                for i in range(index, next_index):
+                    sums[(i // 12, i % 12 + 1)] = (total, count)
+        return sums
+
+    def totals_by_month(self, card=None):
+        return {key: total for key, (total, _) in self.month_sums(card).items()}
+
+    def rows_for_month(self, year, month):
+        index = year * 12 + month - 1
+        for plan in self.plans:
+            row = plan.row_for_month(index)
+            if row:
+                yield row
+
+future_bills = FutureBills()
 
 def parse_currency(val_str):
-    clean = val_str.replace('R$', '').replace('.', '').replace(',', '.')
-    if clean.endswith('D') or clean.endswith('C'):
-        clean = clean[:-1]
-    return float(clean)
+    return brl_to_cents(val_str)
 
 def add_months(sourcedate, months):
     month = sourcedate.month - 1 + months
@@ -47,21 +188,48 @@ def add_months(sourcedate, months):
         31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month-1])
     return datetime.date(year, month, day)
 
+full_date_pattern = re.compile(r'\d{2}/\d{2}/\d{4}')
+
+def header_dates(lines, labels):
+    # Full dates (dd/mm/yyyy) on the first line naming one of labels, e.g.
+    # "PERÍODO: 01/01/2026 A 31/01/2026" or "VENCIMENTO: 19/01/2026"
+    for line in lines:
+        upper = line.upper()
+        if any(label in upper for label in labels):
+            dates = [datetime.datetime.strptime(d, '%d/%m/%Y').date() for d in full_date_pattern.findall(line)]
+            if dates:
+                return dates
+    return []
+
+def row_date(day, month, last_day):
+    # Statement rows only carry dd/mm: the row is the latest such date that
+    # is not after the statement's last day
+    date = datetime.date(last_day.year, month, day)
+    return date if date <= last_day else datetime.date(last_day.year - 1, month, day)
+
+def guessed_date(day, month):
+    # Statements without a header: only right for rows around the trip, so
+    # callers keep just the trip window
+    return datetime.date(2025 if month == 12 else 2026, month, day)
+
 def parse_bank_statement(filename, year_month_map):
     with open(filename, 'r', encoding='utf-8') as f:
         lines = f.readlines()
 
     pattern = re.compile(r'(\d{2}/\d{2})\s+(.*?)\s+(R\$\s?[\d\.,]+[DC])')
+    # Dates come from the statement's period; without one, from the year
+    # guess, limited to the trip
+    period = header_dates(lines, ('PERÍODO', 'PERIODO'))
+    first_day, last_day = (period[0], period[-1]) if period else (TRIP_START, TRIP_END)
     
     for line in lines:
         match = pattern.search(line)
         if match:
             date_str, desc, val_str = match.groups()
             day, month = map(int, date_str.split('/'))
-            year = 2025 if month == 12 else 2026
-            tx_date = datetime.date(year, month, day)
+            tx_date = row_date(day, month, last_day) if period else guessed_date(day, month)
             
-            if not (TRIP_START <= tx_date <= TRIP_END):
+            if not (first_day <= tx_date <= last_day):
                 continue
             if 'C' in val_str:
                 continue
@@ -76,11 +244,11 @@ def parse_bank_statement(filename, year_month_map):
             elif 'DEBIT' in desc or 'MASTERCARD' in desc: 
                  tx_type = 'Debito'
             
-            if "MASTERCARD" in desc and ("DEB.CONV.DEMAIS EMPRESAS" in desc or "DÉB.CONV.DEMAIS EMPRESAS" in desc) and value > 1000:
+            if "MASTERCARD" in desc and ("DEB.CONV.DEMAIS EMPRESAS" in desc or "DÉB.CONV.DEMAIS EMPRESAS" in desc) and value > 100000:
                  desc += " (Pagamento Fatura Cartão)"
                  tx_type = 'Pagamento Fatura'
 
-            transactions.append(Transaction(tx_date, desc.strip(), value, tx_type, line.strip()))
+            yield Transaction(tx_date, desc.strip(), value, tx_type, line.strip())
 
 def parse_cc_statement(filename):
     try:
@@ -91,6 +259,12 @@ def parse_cc_statement(filename):
 
     capture = False
     pattern = re.compile(r'(\d{2}/\d{2})\s+(.*?)\s+(\d+[\.,]\d{2})$') 
+    # Every charge on the invoice is billed on its due date, installments
+    # included (they carry the original purchase date). Without the header,
+    # dates come from the year guess, limited to the trip, and the invoice is
+    # worked out from the purchase date and the installment number.
+    header = header_dates(lines, ('VENCIMENTO',))
+    due_date = header[0] if header else None
     
     for line in lines:
         if "GASTOS DE" in line:
@@ -105,16 +279,17 @@ def parse_cc_statement(filename):
             if match:
                 date_str, desc, val_str = match.groups()
                 day, month = map(int, date_str.split('/'))
-                year = 2025 if month == 12 else 2026
-                tx_date = datetime.date(year, month, day)
-                
-                if not (TRIP_START <= tx_date <= TRIP_END):
-                    continue
+                if due_date:
+                    tx_date = row_date(day, month, due_date)
+                else:
+                    tx_date = guessed_date(day, month)
+                    if not (TRIP_START <= tx_date <= TRIP_END):
+                        continue
                 
-                val_clean = val_str.replace('.', '').replace(',', '.')
-                value = float(val_clean)
+                value = parse_currency(val_str)
                 
                 total_val = value
+                curr = 1
                 inst_match = re.search(r'(\d+)/(\d+)', desc)
                 if inst_match:
                     try:
@@ -123,16 +298,21 @@ def parse_cc_statement(filename):
                             total_val = value * total_inst
                     except:
                         pass
+                invoice_due = due_date or add_months(cycle_due_date(tx_date), max(curr, 1) - 1)
                 
-                transactions.append(Transaction(tx_date, desc.strip(), value, 'Credito', line.strip(), total_purchase_value=total_val))
+                yield Transaction(tx_date, desc.strip(), value, 'Credito', line.strip(), total_purchase_value=total_val, invoice_due=invoice_due)
 
 def parse_cc_futuros(filename):
+    # Returns (trip purchases, installment plans); both are complete when it
+    # returns, so the plans never depend on how the purchases are consumed
+    purchases = []
+    plans = []
     try:
         with open(filename, 'r', encoding='utf-8') as f:
             lines = f.readlines()
     except FileNotFoundError:
         print(f"Warning: {filename} not found.")
-        return
+        return purchases, plans
 
     current_section = None
     pattern = re.compile(r'(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(\d{4})\s+(R\$\s?-?[\d\.,]+)')
@@ -148,18 +328,17 @@ def parse_cc_futuros(filename):
 
         match = pattern.search(line)
         if match:
-            date_str, desc_raw, card, val_str = match.groups()
+            date_str, desc_raw, card_number, val_str = match.groups()
+            card = card_id(card_number)
             day, month, year = map(int, date_str.split('/'))
             tx_date = datetime.date(year, month, day)
             
-            is_negative = '-' in val_str
-            val_clean = val_str.replace('R$', '').replace('.', '').replace(',', '.').replace('-', '').strip()
-            value = float(val_clean)
+            value = parse_currency(val_str)
             
-            if is_negative or value == 0:
+            if value <= 0:
                 continue
 
-            desc = re.sub(r'\s+', ' ', desc_raw).strip()
+            desc = collapse_whitespace(desc_raw)
 
             if TRIP_START <= tx_date <= TRIP_END:
                 inst_match = installment_pattern.search(desc)
@@ -173,79 +352,118 @@ def parse_cc_futuros(filename):
                         should_add = False 
                 
                 if should_add:
-                    transactions.append(Transaction(tx_date, desc, value, 'Credito', line.strip(), total_purchase_value=total_val))
+                    purchases.append(Transaction(tx_date, desc, value, 'Credito', line.strip(), total_purchase_value=total_val, card=card))
 
             base_due_date = None
             if current_section == "NEXT":
-                base_due_date = datetime.date(2026, 2, 19)
+                base_due_date = datetime.date(2026, 2, DUE_DAY)
             elif current_section == "FUTURE":
-                base_due_date = datetime.date(2026, 3, 19)
+                base_due_date = datetime.date(2026, 3, DUE_DAY)
             
             if base_due_date:
                 inst_match = installment_pattern.search(desc)
                 if inst_match:
                     start_inst, total_inst = map(int, inst_match.groups())
-                    remaining_count = total_inst - start_inst + 1
-                    total_purchase = value * total_inst
-                    
-                    for i in range(remaining_count):
-                        current_due_date = add_months(base_due_date, i)
-                        current_inst_num = start_inst + i
-                        amount_paid = (current_inst_num - 1) * value
-                        
-                        # --- MODIFICATION START ---
-                        # Amount remaining is total purchase MINUS all installments UP TO and INCLUDING the current one
-                        amount_remaining_future_only = total_purchase - (current_inst_num * value)
-                        # --- MODIFICATION END ---
-                        
-                        new_desc = re.sub(r'-\s*\d+/\d+', '', desc).strip()
-                        
-                        future_bills.append({
-                            'purchase_date': tx_date.strftime('%d/%m/%Y'),
-                            'description': new_desc,
-                            'value': value,
-                            'due_date': current_due_date,
-                            'due_month': current_due_date.strftime('%B %Y'),
-                            'installment_info': f"{current_inst_num}/{total_inst}",
-                            'total_purchase': total_purchase,
-                            'amount_paid': amount_paid,
-                            'amount_remaining': amount_remaining_future_only # Using the corrected value
-                        })
+                    new_desc = strip_installment(desc)
+                    plans.append(InstallmentPlan(tx_date, new_desc, value, base_due_date, start_inst, total_inst, card))
                 else:
-                    future_bills.append({
-                        'purchase_date': tx_date.strftime('%d/%m/%Y'),
-                        'description': desc,
-                        'value': value,
-                        'due_date': base_due_date,
-                        'due_month': base_due_date.strftime('%B %Y'),
-                        'installment_info': "1/1",
-                        'total_purchase': value,
-                        'amount_paid': 0,
-                        'amount_remaining': 0 # For single payment, no future remaining after this one
-                    })
-
-# Run Parsers
-parse_bank_statement('dec_2025.txt', {})
-parse_bank_statement('jan_2026.txt', {})
-parse_cc_statement('cc_details.txt')
-parse_cc_futuros('cc_futuros.txt')
-
-transactions.sort(key=lambda x: x.date)
+                    # Single payment: 1/1, nothing remaining after this one
+                    plans.append(InstallmentPlan(tx_date, desc, value, base_due_date, card=card))
+
+    return purchases, plans
+
+def transaction_date(t):
+    return t.date
+
+def date_ordered(stream):
+    # Statements are already (almost) in date order. Split the stream into
+    # its ascending runs and merge those instead of sorting the whole file.
+    # The whole file is buffered into runs before the first row comes out.
+    runs = []
+    last_date = None
+    for t in stream:
+        if last_date is None or t.date < last_date:
+            runs.append([])
+        runs[-1].append(t)
+        last_date = t.date
+    yield from heapq.merge(*runs, key=transaction_date)
+
+def tagged(stream, source):
+    for t in stream:
+        t.source = source
+        yield t
+
+# Run Parsers (files are routed by format, see formats.py)
+# Each file becomes a date-ordered stream; the streams are k-way merged and
+# consumed once, in date order, to build the ledger and its totals. The
+# installment plans are collected up front, before any stream is consumed.
+# The account and card statements are read over their whole period (see
+# header_dates): reconciliation needs every charge and invoice payment, while
+# the ledger keeps only the trip's rows.
+inputs = route_directory(INPUT_DIR)
+streams = [tagged(date_ordered(parse_bank_statement(path, {})), 'sicoob_conta') for path in inputs['sicoob_conta']]
+streams += [tagged(date_ordered(parse_cc_statement(path)), 'sicoob_cartao') for path in inputs['sicoob_cartao']]
+for path in inputs['sicoob_futuros']:
+    purchases, plans = parse_cc_futuros(path)
+    for plan in plans:
+        future_bills.add(plan)
+    streams.append(tagged(date_ordered(purchases), 'sicoob_futuros'))
+if not inputs['sicoob_futuros']:
+    print(f"Warning: no 'Lançamentos Futuros' statement found in {INPUT_DIR}.")
+
+transactions = []
+jan_paid_total = 0 # Invoice paid from the account in January
+invoice_payments = [] # (date, cents) of every invoice payment in the account
+account_until = None # Last account statement day read, see reconcile()
+statement_charges = [] # (due date, cents) of purchases on past invoices
+card_purchases = defaultdict(list) # Card id -> its trip purchases (only "Lançamentos Futuros" names the card)
+
+for t in heapq.merge(*streams, key=transaction_date):
+    if t.type == 'Pagamento Fatura':
+        invoice_payments.append((t.date, t.value))
+    if t.source == 'sicoob_conta':
+        account_until = t.date
+    if t.source == 'sicoob_cartao':
+        statement_charges.append((t.invoice_due, t.value))
+    if not (TRIP_START <= t.date <= TRIP_END):
+        continue
+    transactions.append(t)
+    if t.type == 'Pagamento Fatura':
+        jan_paid_total += t.value
+    if t.card is not None:
+        card_purchases[t.card].append(t)
+
+# --- Export Parsed Data (see export.py) ---
+
+export_dataset('transactions', lambda: (t.to_record() for t in transactions), [
+    ('date', 'date'), ('description', 'str'), ('value', 'int'), ('total_purchase_value', 'int'),
+    ('type', 'str'), ('status', 'str'), ('category', 'str'), ('card', 'str'), ('source', 'str')])
+
+# Installments in due-date order (each plan is already ordered, so a heap merge suffices)
+export_dataset('future_bills', lambda: heapq.merge(*(plan.records() for plan in future_bills.plans), key=lambda r: r['due_date']), [
+    ('purchase_date', 'date'), ('description', 'str'), ('value', 'int'), ('due_date', 'date'),
+    ('installment_info', 'str'), ('total_purchase', 'int'), ('amount_paid', 'int'), ('amount_remaining', 'int'),
+    ('card', 'str')])
+
+# --- Invoice Reconciliation (see reconcile.py) ---
+# Past invoices come from the detailed card statement, upcoming ones from the
+# installment plans' month sums (no per-installment rows); each cycle is
+# matched with the account's invoice payments
+future_cycles = [{'due_date': datetime.date(year, month, DUE_DAY), 'card_total': total, 'charges': count}
+                 for (year, month), (total, count) in sorted(future_bills.month_sums().items())]
+reconciliation = reconcile(merge_cycles(billing_cycles(statement_charges), future_cycles), invoice_payments, account_until)
+for row in reconciliation:
+    if row['status'] not in (RECONCILED, OPEN):
+        due = row['due_date'].strftime('%d/%m/%Y') if row['due_date'] else '-'
+        print(f"Reconciliation: {row['status']} (vencimento {due}, cartão R$ {format_cents(row['card_total'])}, pago R$ {format_cents(row['paid'])})")
 
 # --- Prep Future Cards Data ---
-future_totals = defaultdict(float)
+future_totals = future_bills.totals_by_month()
 month_translation_short = {
     1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
     7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
 }
 
-for bill in future_bills:
-    m_key = (bill['due_date'].year, bill['due_date'].month)
-    future_totals[m_key] += bill['value']
-
-# Calculate January Paid Total from Transactions
-jan_paid_total = sum(t.value for t in transactions if t.type == 'Pagamento Fatura')
-
 # Build List of Monthly Cards (Jan + Future)
 cards_data = []
 
@@ -263,79 +481,59 @@ for key in sorted(future_totals.keys()):
 
 # Build HTML for Cards
 cards_html = ""
-for card in cards_data:
-    card_id = f"invoice-{card['year']}-{card['month']}"
-    val_fmt = f"R$ {card['val']:,.2f}".replace('.', 'X').replace(',', '.').replace('X', ',')
+for invoice in cards_data:
+    invoice_id = f"invoice-{invoice['year']}-{invoice['month']}"
+    val_fmt = format_brl(invoice['val'])
     
     cards_html += f"""
-    <div class="card clickable-card" id="{card_id}" onclick="togglePaid(this)">
+    <div class="card clickable-card" id="{invoice_id}" onclick="togglePaid(this)">
         <div class="check-icon">✓</div>
-        <h3>Fatura {card['label']}</h3>
-        <p class="money" data-val="{card['val']}">{val_fmt}</p>
+        <h3>Fatura {invoice['label']}</h3>
+        <p class="money" data-val="{to_units(invoice['val'])}">{val_fmt}</p>
         <small class="status-text">Aberto</small>
     </div>
     """
 
 
+# --- Category and Month Cards (pivots over the export, see analytics.py) ---
+pivots = build_pivots(EXPORT_DIR)
+
+def pivot_cards(rows, label=str):
+    html = ""
+    for row in rows:
+        if not row['total']:
+            continue
+        html += f"""
+    <div class="card">
+        <h3>{label(row['key'])}</h3>
+        <p class="money" data-val="{to_units(row['total'])}">{format_brl(row['total'])}</p>
+    </div>
+    """
+    return html
+
+def month_label(key):
+    year, month = map(int, key.split('-'))
+    return f"{month_translation_short[month]}/{year}"
+
+category_cards_html = pivot_cards(sorted(pivots['category'], key=lambda row: -row['total']))
+month_cards_html = pivot_cards(pivots['month'], month_label)
+
 # --- Generate Main Report (relatorio_viagem.html) ---
 
-data = [t.to_dict() for t in transactions]
-json_data = json.dumps(data, indent=2)
+def render_viagem():
+    if EMBED_TRANSACTIONS:
+        json_data = json.dumps([t.to_dict() for t in transactions], indent=2)
+    else:
+        json_data = 'null'
 
-html_content = f"""
+    html_content = f"""
 <!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Relatório de Viagem - Brasil 25/26</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f4f4f9; padding: 20px; }}
-        .container {{ max-width: 1000px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }}
-        h1 {{ color: #333; }}
-        .summary {{ display: flex; gap: 20px; margin-bottom: 20px; flex-wrap: wrap; }}
-        .card {{ background: #eee; padding: 15px; border-radius: 5px; flex: 1; text-align: center; min-width: 150px; position: relative; transition: all 0.2s; }}
-        .card h3 {{ margin: 0; color: #555; font-size: 0.9em; }}
-        .card p {{ margin: 5px 0 0; font-size: 1.5em; font-weight: bold; color: #2c3e50; }}
-        .card.highlight {{ background-color: #fcf3cf; border: 1px solid #f1c40f; }}
-        .card.highlight p {{ color: #d35400; }}
-        
-        /* Clickable Invoice Cards */
-        .clickable-card {{ cursor: pointer; border-left: 5px solid #3498db; background-color: #eaf2f8; }}
-        .clickable-card:hover {{ transform: translateY(-2px); box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        
-        /* Paid State */
-        .clickable-card.paid {{ background-color: #d5dbdb; border-left-color: #7f8c8d; opacity: 0.8; }}
-        .clickable-card.paid h3, .clickable-card.paid p {{ text-decoration: line-through; color: #7f8c8d; }}
-        .clickable-card.paid .status-text {{ color: #27ae60; font-weight: bold; text-decoration: none; }}
-        .clickable-card .check-icon {{ display: none; position: absolute; top: 10px; right: 10px; color: #27ae60; font-weight: bold; font-size: 1.2em; }}
-        .clickable-card.paid .check-icon {{ display: block; }}
-        .status-text {{ display: block; margin-top: 5px; font-size: 0.8em; color: #e74c3c; }}
-        .clickable-card.paid .status-text {{ color: #27ae60; }}
-
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background-color: #2c3e50; color: white; cursor: pointer; user-select: none; }}
-        th:hover {{ background-color: #34495e; }}
-        tr:hover {{ background-color: #f1f1f1; }}
-        .badge {{ padding: 4px 8px; border-radius: 4px; font-size: 0.8em; font-weight: bold; color: white; }}
-        .Pix {{ background-color: #27ae60; }}
-        .Debito {{ background-color: #2980b9; }}
-        .Credito {{ background-color: #e67e22; }}
-        .Pagamento-Fatura {{ background-color: #7f8c8d; }}
-        .btn {{ display: inline-block; padding: 10px 20px; background-color: #3498db; color: white; text-decoration: none; border-radius: 5px; font-weight: bold; margin-bottom: 20px; }}
-        .btn:hover {{ background-color: #2980b9; }}
-        
-        .controls {{ background: #e8f6f3; padding: 15px; border-radius: 5px; margin-bottom: 20px; display: flex; gap: 15px; align-items: center; border: 1px solid #1abc9c; flex-wrap: wrap; }}
-        .controls label {{ font-weight: bold; color: #16a085; }}
-        .controls input, .controls select {{ padding: 5px; border: 1px solid #ddd; border-radius: 3px; }}
-        .currency-toggle {{ background-color: #16a085; color: white; border: none; padding: 8px 15px; border-radius: 3px; cursor: pointer; font-weight: bold; }}
-        .currency-toggle:hover {{ background-color: #1abc9c; }}
-        
-        .filters input {{ width: 200px; }}
-        
-        .section-title {{ border-bottom: 2px solid #eee; padding-bottom: 10px; margin-bottom: 15px; color: #7f8c8d; font-size: 1.1em; }}
-    </style>
+    {stylesheets('common.css', 'viagem.css')}
 </head>
 <body>
 
@@ -346,6 +544,7 @@ html_content = f"""
             <a href="relatorio_poupanca.html" class="btn" style="background-color:#c0392b;">Minhas Poupanças</a>
             <a href="relatorio_contas_fixas.html" class="btn" style="background-color:#8e44ad;">Contas Fixas</a>
             <a href="relatorio_futuro.html" class="btn">Ver Detalhes Futuros</a>
+            <a href="relatorio_fluxo.html" class="btn" style="background-color:#16a085;">Fluxo de Caixa</a>
         </div>
     </div>
 
@@ -371,6 +570,16 @@ html_content = f"""
         </div>
     </div>
     
+    <h3 class="section-title">Gastos por Categoria</h3>
+    <div class="summary">
+        {category_cards_html}
+    </div>
+
+    <h3 class="section-title">Gastos por Mês</h3>
+    <div class="summary">
+        {month_cards_html}
+    </div>
+
     <h3 class="section-title">Próximos Vencimentos (Cartão de Crédito)</h3>
     <p style="font-size:0.9em; color:#7f8c8d; margin-top:-10px; margin-bottom:15px;">Clique no cartão para marcar como pago.</p>
     <div class="summary">
@@ -396,6 +605,7 @@ html_content = f"""
                 <th onclick="sortTable('date')">Data &#8693;</th>
                 <th onclick="sortTable('description')">Descrição &#8693;</th>
                 <th onclick="sortTable('type')">Tipo &#8693;</th>
+                <th onclick="sortTable('category')">Categoria &#8693;</th>
                 <th onclick="sortTable('status')">Status &#8693;</th>
                 <th onclick="sortTable('value')">Valor Parcela &#8693;</th>
                 <th onclick="sortTable('total_purchase_value')">Valor Total (Compra) &#8693;</th>
@@ -403,225 +613,44 @@ html_content = f"""
         </thead>
         <tbody></tbody>
     </table>
+    <button id="load-more" class="btn" style="display:none; margin-top:15px;" onclick="loadMore()">Carregar mais</button>
 </div>
 
 <script>
     const transactions = {json_data};
-    let currentCurrency = localStorage.getItem('currency') || 'BRL';
-    let exchangeRate = parseFloat(localStorage.getItem('exchangeRate')) || 4.20;
-    
-    let sortField = 'date';
-    let sortDir = 'asc';
-
-    // Init
-    document.getElementById('exchange-rate').value = exchangeRate;
-    updateButtonLabel();
-    renderTable();
-    updatePrices(); 
-    initPaidStatus(); // Load Saved Paid Status
-
-    function updateRate() {{
-        exchangeRate = parseFloat(document.getElementById('exchange-rate').value);
-        localStorage.setItem('exchangeRate', exchangeRate);
-        renderTable();
-        updatePrices();
-    }}
-
-    function toggleCurrency() {{
-        currentCurrency = currentCurrency === 'BRL' ? 'CAD' : 'BRL';
-        localStorage.setItem('currency', currentCurrency);
-        updateButtonLabel();
-        renderTable();
-        updatePrices();
-    }}
-
-    function updateButtonLabel() {{
-        const btn = document.getElementById('btn-currency');
-        btn.textContent = currentCurrency === 'BRL' ? 'Ver em CAD' : 'Ver em BRL';
-    }}
-
-    function formatCurrency(value) {{
-        if (currentCurrency === 'CAD') {{
-            return (value / exchangeRate).toLocaleString('en-CA', {{ style: 'currency', currency: 'CAD' }});
-        }}
-        return value.toLocaleString('pt-BR', {{ style: 'currency', currency: 'BRL' }});
-    }}
-    
-    function updatePrices() {{
-        const elements = document.querySelectorAll('.money');
-        elements.forEach(el => {{
-            const val = parseFloat(el.getAttribute('data-val'));
-            el.textContent = formatCurrency(val);
-        }});
-    }}
-    
-    // --- Paid Status Logic ---
-    function initPaidStatus() {{
-        document.querySelectorAll('.clickable-card').forEach(card => {{
-            const id = card.id;
-            const savedStatus = localStorage.getItem('status-' + id);
-            
-            if (id === 'invoice-2026-1' && savedStatus === null) {{ // Default Jan to paid
-                markAsPaid(card, true);
-                return;
-            }}
-
-            if (savedStatus === 'true') {{
-                markAsPaid(card, true);
-            }} else {{
-                markAsPaid(card, false);
-            }}
-        }});
-    }}
-
-    function togglePaid(card) {{
-        const isPaid = card.classList.contains('paid');
-        markAsPaid(card, !isPaid);
-    }}
-
-    function markAsPaid(card, paid) {{
-        const statusText = card.querySelector('.status-text');
-        if (paid) {{
-            card.classList.add('paid');
-            statusText.textContent = 'PAGO';
-            localStorage.setItem('status-' + card.id, 'true');
-        }} else {{
-            card.classList.remove('paid');
-            statusText.textContent = 'Aberto';
-            localStorage.setItem('status-' + card.id, 'false');
-        }}
-    }}
-    // -------------------------
-
-    function sortTable(field) {{
-        if (sortField === field) {{
-            sortDir = sortDir === 'asc' ? 'desc' : 'asc';
-        }} else {{
-            sortField = field;
-            sortDir = 'asc';
-        }}
-        renderTable();
-    }}
-
-    function renderTable() {{
-        const tbody = document.querySelector('#expenses-table tbody');
-        const showFatura = document.getElementById('toggle-fatura').checked;
-        const searchDesc = document.getElementById('search-desc').value.toLowerCase();
-        const filterType = document.getElementById('filter-type').value;
-        
-        tbody.innerHTML = '';
-        
-        let filtered = transactions.filter(tx => {{
-            if (!showFatura && tx.type === 'Pagamento Fatura') return false;
-            if (searchDesc && !tx.description.toLowerCase().includes(searchDesc)) return false;
-            if (filterType !== 'all' && tx.type !== filterType) return false;
-            return true;
-        }});
-        
-        filtered.sort((a, b) => {{
-            let valA = a[sortField];
-            let valB = b[sortField];
-            if (typeof valA === 'string') {{ valA = valA.toLowerCase(); valB = valB.toLowerCase(); }}
-            if (valA < valB) return sortDir === 'asc' ? -1 : 1;
-            if (valA > valB) return sortDir === 'asc' ? 1 : -1;
-            return 0;
-        }});
-        
-        let totalPix = 0;
-        let totalDebito = 0;
-        let totalComprometido = 0;
-
-        filtered.forEach(tx => {{
-            if (tx.type === 'Pix') {{
-                totalPix += tx.value;
-                totalComprometido += tx.value;
-            }}
-            else if (tx.type === 'Debito') {{
-                totalDebito += tx.value;
-                totalComprometido += tx.value;
-            }}
-            else if (tx.type === 'Credito') {{
-                totalComprometido += tx.total_purchase_value;
-            }}
-            // Pagamento Fatura is not added to any of these main cards, it's just tracked as 'paid'
-            // The value of 'totalCredito' card was removed as it's replaced by the monthly cards
-            
-            const row = document.createElement('tr');
-            const typeClass = tx.type.replace(' ', '-'); 
-            const totalDisplay = (tx.type === 'Credito' && tx.total_purchase_value > tx.value) 
-                                ? `<strong>${{formatCurrency(tx.total_purchase_value)}}</strong>` 
-                                : '-';
-
-            row.innerHTML = `
-                <td>${{tx.display_date}}</td>
-                <td>${{tx.description}}</td>
-                <td><span class="badge ${{typeClass}}">${{tx.type}}</span></td>
-                <td>${{tx.status}}</td>
-                <td>${{formatCurrency(tx.value)}}</td>
-                <td style="color:#555;">${{totalDisplay}}</td>
-            `;
-            tbody.appendChild(row);
-        }});
-
-        // Update Dynamic Summary Cards
-        document.getElementById('total-pix').textContent = formatCurrency(totalPix);
-        document.getElementById('total-debito').textContent = formatCurrency(totalDebito);
-        document.getElementById('total-comprometido').textContent = formatCurrency(totalComprometido);
-    }}
 </script>
+{scripts('currency.js', 'viagem.js')}
 
 </body>
 </html>
 """
-
-with open('relatorio_viagem.html', 'w', encoding='utf-8') as f:
-    f.write(html_content)
-print("Report generated: relatorio_viagem.html")
+    return html_content
 
 # --- Generate Future Bills Report (relatorio_futuro.html) ---
 
-bills_by_month = defaultdict(list)
-totals_by_month = defaultdict(float)
+totals_by_month = future_totals
 
 month_translation = {
     1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril', 5: 'Maio', 6: 'Junho',
     7: 'Julho', 8: 'Agosto', 9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
 }
 
-for bill in future_bills:
-    m_key = (bill['due_date'].year, bill['due_date'].month)
-    bills_by_month[m_key].append(bill)
-    totals_by_month[m_key] += bill['value']
+sorted_months = sorted(totals_by_month.keys())
+detail_months = set(sorted_months if FUTURE_DETAIL_MONTHS is None else sorted_months[:FUTURE_DETAIL_MONTHS])
 
-sorted_months = sorted(bills_by_month.keys())
+# Per-card breakdown, straight from the partitions built while parsing
+cards = sorted((future_bills.by_card.keys() | card_purchases.keys()) - {None}, key=card_numbers.__getitem__)
+card_month_totals = {card: future_bills.totals_by_month(card) for card in cards}
 
-html_future = f"""
+def render_futuro():
+    html_future = f"""
 <!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Previsão de Faturas Futuras</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f4f4f9; padding: 20px; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }}
-        h1 {{ color: #333; }}
-        .back-link {{ display: inline-block; margin-bottom: 20px; color: #3498db; text-decoration: none; }}
-        .month-section {{ margin-bottom: 30px; border: 1px solid #eee; border-radius: 5px; overflow: hidden; }}
-        .month-header {{ background-color: #2c3e50; color: white; padding: 15px; display: flex; justify-content: space-between; align-items: center; }}
-        .month-header h2 {{ margin: 0; font-size: 1.2em; }}
-        .month-total {{ font-size: 1.2em; font-weight: bold; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background-color: #ecf0f1; color: #2c3e50; font-size: 0.9em; }}
-        .small-text {{ font-size: 0.85em; color: #666; }}
-        
-        .controls {{ background: #e8f6f3; padding: 15px; border-radius: 5px; margin-bottom: 20px; display: flex; gap: 15px; align-items: center; border: 1px solid #1abc9c; }}
-        .controls label {{ font-weight: bold; color: #16a085; }}
-        .controls input {{ padding: 5px; border: 1px solid #ddd; border-radius: 3px; width: 80px; }}
-        .currency-toggle {{ background-color: #16a085; color: white; border: none; padding: 8px 15px; border-radius: 3px; cursor: pointer; font-weight: bold; }}
-        .currency-toggle:hover {{ background-color: #1abc9c; }}
-    </style>
+    {stylesheets('common.css', 'futuro.css')}
 </head>
 <body>
 
@@ -634,19 +663,106 @@ html_future = f"""
         <input type="number" id="exchange-rate" value="4.20" step="0.01" onchange="updateRate()">
         <button class="currency-toggle" onclick="toggleCurrency()" id="btn-currency">Ver em CAD</button>
     </div>
+
+    <div class="month-section">
+        <div class="month-header">
+            <h2>Conciliação das Faturas</h2>
+        </div>
+        <table>
+            <thead>
+                <tr>
+                    <th>Vencimento</th>
+                    <th>Compras</th>
+                    <th>Total Cartão</th>
+                    <th>Pago em Conta</th>
+                    <th>Data Pagamento</th>
+                    <th>Diferença</th>
+                    <th>Status</th>
+                </tr>
+            </thead>
+            <tbody>
+"""
+
+    for row in reconciliation:
+        status_class = 'status-' + row['status'].lower().replace(' ', '-')
+        html_future += f"""
+                <tr>
+                    <td>{row['due_date'].strftime('%d/%m/%Y') if row['due_date'] else '-'}</td>
+                    <td>{row['charges']}</td>
+                    <td class="money" data-val="{to_units(row['card_total'])}">R$ {format_cents(row['card_total'])}</td>
+                    <td class="money" data-val="{to_units(row['paid'])}">R$ {format_cents(row['paid'])}</td>
+                    <td class="small-text">{', '.join(d.strftime('%d/%m/%Y') for d in row['payment_dates']) or '-'}</td>
+                    <td class="money" data-val="{to_units(row['gap'])}">R$ {format_cents(row['gap'])}</td>
+                    <td><span class="{status_class}">{row['status']}</span></td>
+                </tr>
+        """
+
+    html_future += """
+            </tbody>
+        </table>
+    </div>
+"""
+
+    if cards:
+        month_headers = ''.join(f"<th>{month_translation[month][:3]}/{year}</th>" for year, month in sorted_months)
+        html_future += f"""
+    <div class="month-section">
+        <div class="month-header">
+            <h2>Por Cartão</h2>
+        </div>
+        <table>
+            <thead>
+                <tr>
+                    <th>Cartão</th>
+                    <th>Compras na Viagem (Lançamentos Futuros)</th>
+                    {month_headers}
+                    <th>Total Futuro</th>
+                </tr>
+            </thead>
+            <tbody>
+"""
+        for card in cards:
+            purchases = card_purchases.get(card, [])
+            purchases_total = sum(t.total_purchase_value for t in purchases)
+            month_totals = card_month_totals[card]
+            month_cells = ''.join(
+                f'<td class="money" data-val="{to_units(month_totals.get(key, 0))}">R$ {format_cents(month_totals.get(key, 0))}</td>'
+                for key in sorted_months)
+            future_total = sum(month_totals.values())
+            html_future += f"""
+                <tr>
+                    <td>Final {card_numbers[card]}</td>
+                    <td class="money" data-val="{to_units(purchases_total)}">R$ {format_cents(purchases_total)}</td>
+                    {month_cells}
+                    <td class="money" data-val="{to_units(future_total)}"><strong>R$ {format_cents(future_total)}</strong></td>
+                </tr>
+        """
+        html_future += """
+            </tbody>
+        </table>
+    </div>
 """
 
-for year, month in sorted_months:
-    month_name = month_translation.get(month, 'Mês Desconhecido')
-    total = totals_by_month[(year, month)]
-    bills = bills_by_month[(year, month)]
+    for year, month in sorted_months:
+        month_name = month_translation.get(month, 'Mês Desconhecido')
+        total = totals_by_month[(year, month)]
     
-    html_future += f"""
+        html_future += f"""
     <div class="month-section">
         <div class="month-header">
             <h2>{month_name} {year} (Vencimento 19/{month:02d})</h2>
-            <span class="month-total money" data-val="{total}">R$ {total:,.2f}</span>
+            <span class="month-total money" data-val="{to_units(total)}">R$ {format_cents(total)}</span>
         </div>
+    """
+
+        if (year, month) not in detail_months:
+            html_future += """
+        <p class="small-text" style="padding: 0 15px;">Parcelas deste mês não detalhadas.</p>
+    </div>
+    """
+            continue
+
+        html_future += """
         <table>
             <thead>
                 <tr>
@@ -662,76 +778,40 @@ for year, month in sorted_months:
             <tbody>
     """
     
-    for bill in bills:
-        val_fmt = f'R$ {bill["value"]:,.2f}' 
+        for bill in future_bills.rows_for_month(year, month):
+            val_fmt = f'R$ {format_cents(bill["value"])}'
         
-        html_future += f"""
+            html_future += f"""
                 <tr>
                     <td>{bill['purchase_date']}</td>
                     <td>{bill['description']}</td>
-                    <td><strong class="money" data-val="{bill['value']}">{val_fmt}</strong></td>
+                    <td><strong class="money" data-val="{to_units(bill['value'])}">{val_fmt}</strong></td>
                     <td style="text-align:center;">{bill['installment_info']}</td>
-                    <td class="small-text money" data-val="{bill['total_purchase']}">-</td>
-                    <td class="small-text money" data-val="{bill['amount_paid']}">-</td>
-                    <td class="small-text money" data-val="{bill['amount_remaining']}" style="color: #c0392b;">-</td>
+                    <td class="small-text money" data-val="{to_units(bill['total_purchase'])}">-</td>
+                    <td class="small-text money" data-val="{to_units(bill['amount_paid'])}">-</td>
+                    <td class="small-text money" data-val="{to_units(bill['amount_remaining'])}" style="color: #c0392b;">-</td>
                 </tr>
         """
         
-    html_future += """
+        html_future += """
             </tbody>
         </table>
     </div>
     """
 
-html_future += """
+    html_future += f"""
 </div>
 
-<script>
-    let currentCurrency = localStorage.getItem('currency') || 'BRL';
-    let exchangeRate = parseFloat(localStorage.getItem('exchangeRate')) || 4.20;
-
-    document.getElementById('exchange-rate').value = exchangeRate;
-    updateButtonLabel();
-    updatePrices();
-
-    function updateRate() {
-        exchangeRate = parseFloat(document.getElementById('exchange-rate').value);
-        localStorage.setItem('exchangeRate', exchangeRate);
-        updatePrices();
-    }
-
-    function toggleCurrency() {
-        currentCurrency = currentCurrency === 'BRL' ? 'CAD' : 'BRL';
-        localStorage.setItem('currency', currentCurrency);
-        updateButtonLabel();
-        updatePrices();
-    }
-
-    function updateButtonLabel() {
-        const btn = document.getElementById('btn-currency');
-        btn.textContent = currentCurrency === 'BRL' ? 'Ver em CAD' : 'Ver em BRL';
-    }
-
-    function formatCurrency(value) {
-        if (currentCurrency === 'CAD') {
-            return (value / exchangeRate).toLocaleString('en-CA', { style: 'currency', currency: 'CAD' });
-        }
-        return value.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
-    }
-    
-    function updatePrices() {
-        const elements = document.querySelectorAll('.money');
-        elements.forEach(el => {
-            const val = parseFloat(el.getAttribute('data-val'));
-            el.textContent = formatCurrency(val);
-        });
-    }
-</script>
+{scripts('currency.js')}
 
 </body>
 </html>
 """
+    return html_future
+
+# --- Write Reports ---
 
-with open('relatorio_futuro.html', 'w', encoding='utf-8') as f:
-    f.write(html_future)
-print("Report generated: relatorio_futuro.html")
\ No newline at end of file
+write_reports({
+    'relatorio_viagem.html': render_viagem,
+    'relatorio_futuro.html': render_futuro,
+})
@@ -1,10 +1,21 @@
 import csv
 import datetime
-from collections import defaultdict
+import json
+from collections import Counter, defaultdict
+from money import decimal_to_cents, format_cents
+from formats import route_directory
+from outputs import write_if_changed
+from assets import stylesheets, scripts
+from export import EPOCH, export_dataset
+from projections import next_due_date, project_bills, schedule_stream
+from anomalies import PayeeMonitor
 
 # Config
-INPUT_FILE = 'dec to feb statment.csv'
+INPUT_DIR = '.'
+INPUT_FILE = 'dec to feb statment.csv' # Fallback when no RBC export is detected
 OUTPUT_FILE = 'relatorio_contas_fixas.html'
+PROJECTION_MONTHS = 12 # Cash-flow horizon (months, including the current one)
+SCHEDULE_MONTHS = 36 # Horizon of the exported payment schedule used by the cash-flow timeline
 
 # Keywords to track
 TRACKED_BILLS = {
@@ -21,54 +32,55 @@ def parse_date(date_str):
     return datetime.datetime.strptime(date_str.strip(), '%Y-%m-%d').date()
 
 def predict_next_date(last_date, frequency):
-    if frequency == 'Bi-weekly':
-        return last_date + datetime.timedelta(days=14)
-    elif frequency == 'Monthly':
-        # Simple Logic: Add 30 days or keep same day next month
-        next_month = last_date.month + 1
-        year = last_date.year
-        if next_month > 12:
-            next_month = 1
-            year += 1
-        
-        # Try to keep same day, handle month end
-        day = last_date.day
-        try:
-            return datetime.date(year, next_month, day)
-        except ValueError:
-            return datetime.date(year, next_month + 1, 1) - datetime.timedelta(days=1)
-    return last_date
+    return next_due_date(last_date, frequency)
 
 bill_history = defaultdict(list)
 
-# Read CSV
-with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-    reader = csv.reader(f)
-    for row in reader:
-        if len(row) < 3: continue
-        
-        date_str = row[0]
-        desc = row[1]
-        amount_str = row[2]
-        
-        if not amount_str: continue # Skip if no withdrawal amount (deposits)
-        
-        try:
-            date = parse_date(date_str)
-            amount = float(amount_str)
+# Read CSV exports (one per period, routed by format)
+# Exports may overlap ("dec to feb", "jan to mar"): a (date, description,
+# amount) row is only taken as many times as the file that has it most often
+# does, so repeated rows within one export still count
+input_files = route_directory(INPUT_DIR)['rbc_csv'] or [INPUT_FILE]
+seen_rows = Counter()
+
+for input_file in input_files:
+    file_rows = Counter()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if len(row) < 3: continue
             
-            for keyword, info in TRACKED_BILLS.items():
-                if keyword in desc:
-                    bill_history[keyword].append({
-                        'date': date,
-                        'amount': amount,
-                        'desc': desc
-                    })
-                    break # Matched one, stop
-        except ValueError:
-            continue
+            date_str = row[0]
+            desc = row[1]
+            amount_str = row[2]
+            
+            if not amount_str: continue # Skip if no withdrawal amount (deposits)
+            
+            try:
+                date = parse_date(date_str)
+                amount = decimal_to_cents(amount_str)
+
+                key = (date, desc, amount)
+                file_rows[key] += 1
+                if file_rows[key] <= seen_rows[key]:
+                    continue # Already read from an overlapping export
+                
+                for keyword, info in TRACKED_BILLS.items():
+                    if keyword in desc:
+                        bill_history[keyword].append({
+                            'date': date,
+                            'amount': amount,
+                            'desc': desc
+                        })
+                        break # Matched one, stop
+            except ValueError:
+                continue
+    seen_rows |= file_rows
 
 # Analyze and Generate Data
+# Amount statistics and anomaly flags come from one streaming pass per bill,
+# oldest payment first (see anomalies.py)
+monitor = PayeeMonitor()
 report_data = []
 
 for keyword, info in TRACKED_BILLS.items():
@@ -81,15 +93,19 @@ for keyword, info in TRACKED_BILLS.items():
     last_payment = history[0]
     next_due = predict_next_date(last_payment['date'], info['frequency'])
     
-    # Calculate average amount (simplified)
-    avg_amount = sum(h['amount'] for h in history) / len(history)
+    for h in reversed(history):
+        monitor.observe(keyword, h['date'], h['amount'])
+    stats = monitor.stats[keyword]
     
     report_data.append({
         'name': info['name'],
         'frequency': info['frequency'],
         'last_date': last_payment['date'],
         'last_amount': last_payment['amount'],
-        'avg_amount': avg_amount,
+        'avg_amount': stats.mean_cents(),
+        'min_amount': stats.min,
+        'max_amount': stats.max,
+        'alerts': monitor.flags[keyword][::-1], # Newest first
         'next_due': next_due,
         'history': history,
         'status': 'Pago' if (datetime.date.today() - next_due).days < -5 else 'Próximo'
@@ -98,6 +114,24 @@ for keyword, info in TRACKED_BILLS.items():
 # Sort by Next Due Date
 report_data.sort(key=lambda x: x['next_due'])
 
+# Export payment history (see export.py)
+export_dataset('fixed_bills', lambda: (
+    {'bill': TRACKED_BILLS[keyword]['name'], 'frequency': TRACKED_BILLS[keyword]['frequency'],
+     'date': h['date'], 'amount': h['amount'], 'description': h['desc']}
+    for keyword, history in bill_history.items() for h in history
+), [('bill', 'str'), ('frequency', 'str'), ('date', 'date'), ('amount', 'int'), ('description', 'str')])
+
+# Cash-flow projection, every bill at its average amount (see projections.py)
+today = datetime.date.today()
+projection_bills = [{'name': b['name'], 'frequency': b['frequency'], 'last_date': b['last_date'], 'amount': b['avg_amount']}
+                    for b in report_data]
+projection_series, projection_totals, projection_counts = project_bills(projection_bills, today.replace(day=1), PROJECTION_MONTHS)
+schedule_series, _, _ = project_bills(projection_bills, today.replace(day=1), SCHEDULE_MONTHS)
+
+# Export the projected payments in due-date order, for parse_timeline.py
+export_dataset('fixed_bill_schedule', lambda: schedule_stream(projection_bills, schedule_series),
+               [('bill', 'str'), ('frequency', 'str'), ('due_date', 'date'), ('amount', 'int')])
+
 # Generate HTML
 html = f"""
 <!DOCTYPE html>
@@ -106,32 +140,7 @@ html = f"""
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Contas Fixas e Previsões</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f0f2f5; padding: 20px; }}
-        .container {{ max-width: 900px; margin: 0 auto; background: white; padding: 30px; border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.08); }}
-        h1 {{ color: #2c3e50; border-bottom: 2px solid #eee; padding-bottom: 10px; }}
-        .back-link {{ display: inline-block; margin-bottom: 20px; color: #3498db; text-decoration: none; font-weight: bold; }}
-        .back-link:hover {{ text-decoration: underline; }}
-        
-        .bill-card {{ background: #fff; border: 1px solid #e1e4e8; border-radius: 8px; margin-bottom: 15px; padding: 20px; display: flex; align-items: center; justify-content: space-between; transition: transform 0.2s; }}
-        .bill-card:hover {{ transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0,0,0,0.05); border-color: #3498db; }}
-        
-        .bill-info {{ flex: 1; }}
-        .bill-name {{ font-size: 1.2em; font-weight: bold; color: #2c3e50; margin: 0; }}
-        .bill-freq {{ font-size: 0.85em; color: #7f8c8d; text-transform: uppercase; letter-spacing: 0.5px; background: #eee; padding: 2px 6px; border-radius: 4px; }}
-        
-        .bill-dates {{ text-align: right; min-width: 150px; }}
-        .next-label {{ font-size: 0.8em; color: #95a5a6; display: block; }}
-        .next-date {{ font-size: 1.4em; font-weight: bold; color: #e74c3c; }}
-        .amount {{ font-size: 1.1em; color: #27ae60; font-weight: 600; margin-top: 4px; display: block; }}
-        
-        .history-btn {{ background: none; border: none; color: #3498db; cursor: pointer; padding: 0; font-size: 0.9em; margin-top: 5px; }}
-        .history-list {{ display: none; margin-top: 15px; background: #f9f9f9; padding: 10px; border-radius: 6px; width: 100%; font-size: 0.9em; }}
-        .history-item {{ display: flex; justify-content: space-between; border-bottom: 1px solid #eee; padding: 4px 0; }}
-        
-        .badge-bi {{ background-color: #e8f4fd; color: #2980b9; }}
-        .badge-mo {{ background-color: #fef9e7; color: #f39c12; }}
-    </style>
+    {stylesheets('common.css', 'contas_fixas.css')}
 </head>
 <body>
 
@@ -142,56 +151,79 @@ html = f"""
 
 """
 
-today = datetime.date.today()
+# Payment histories are not rendered as HTML: they are embedded once as
+# compact [days since 1970-01-01, cents] pairs and each list is built by
+# contas_fixas.js the first time it is expanded.
+history_data = {}
 
 for bill in report_data:
     days_until = (bill['next_due'] - today).days
     date_color = "#e74c3c" if days_until <= 7 else "#2c3e50"
     freq_class = "badge-bi" if bill['frequency'] == 'Bi-weekly' else "badge-mo"
     
-    # Toggle logic for history
     hist_id = f"hist-{bill['name'].replace(' ', '')}"
+    history_data[hist_id] = [[(h['date'] - EPOCH).days, h['amount']] for h in bill['history']]
+
+    alerts_html = ''.join(
+        f'<p class="bill-alert">&#9888; {alert["date"].strftime("%d/%m/%Y")}: {" / ".join(alert["flags"])} '
+        f'(CAD$ {format_cents(alert["amount"])}, média anterior CAD$ {format_cents(alert["expected"])})</p>'
+        for alert in bill['alerts'])
     
     html += f"""
         <div class="bill-card">
             <div class="bill-info">
                 <p class="bill-name">{bill['name']} <span class="bill-freq {freq_class}">{bill['frequency']}</span></p>
                 <p style="margin: 5px 0 0; color: #666; font-size: 0.9em;">
-                    Último pgto: {bill['last_date'].strftime('%d/%m/%Y')} (R$ {bill['last_amount']:.2f})
+                    Último pgto: {bill['last_date'].strftime('%d/%m/%Y')} (CAD$ {format_cents(bill['last_amount'])})
                 </p>
-                <button class="history-btn" onclick="document.getElementById('{hist_id}').style.display = document.getElementById('{hist_id}').style.display === 'block' ? 'none' : 'block'">
+                <p class="bill-summary">
+                    {len(bill['history'])} pagamentos &middot; mín CAD$ {format_cents(bill['min_amount'])} &middot; máx CAD$ {format_cents(bill['max_amount'])} &middot; média CAD$ {format_cents(bill['avg_amount'])}
+                </p>
+                {alerts_html}
+                <button class="history-btn" onclick="toggleHistory('{hist_id}')">
                     Ver Histórico ({len(bill['history'])}) &#9662;
                 </button>
-                <div id="{hist_id}" class="history-list">
-    """
-    
-    for h in bill['history']:
-        html += f"""
-                    <div class="history-item">
-                        <span>{h['date'].strftime('%d/%m/%Y')}</span>
-                        <span>R$ {h['amount']:.2f}</span>
-                    </div>
-        """
-        
-    html += f"""
-                </div>
+                <div id="{hist_id}" class="history-list"></div>
             </div>
             <div class="bill-dates">
                 <span class="next-label">Próximo Vencimento</span>
                 <span class="next-date" style="color: {date_color}">{bill['next_due'].strftime('%d/%m')}</span>
                 <span class="next-label" style="font-size:0.7em; margin-top:2px;">({days_until} dias)</span>
-                <span class="amount">~R$ {bill['avg_amount']:.2f}</span>
+                <span class="amount">~CAD$ {format_cents(bill['avg_amount'])}</span>
             </div>
         </div>
     """
 
-html += """
+# Expected outflow per month
+month_names = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+}
+html += f"""
+        <h2 class="projection-title">Projeção de Saídas ({PROJECTION_MONTHS} meses)</h2>
+        <table class="projection-table">
+            <tr><th>Mês</th><th>Pagamentos</th><th>Total Previsto</th></tr>
+"""
+
+for (year, month), total in projection_totals.items():
+    html += f"""
+            <tr><td>{month_names[month]}/{year}</td><td>{projection_counts[(year, month)]}</td><td>CAD$ {format_cents(total)}</td></tr>
+    """
+
+html += f"""
+            <tr class="projection-total"><td>Total</td><td></td><td>CAD$ {format_cents(sum(projection_totals.values()))}</td></tr>
+        </table>
     </div>
+
+<script>
+    const BILL_HISTORY = {json.dumps(history_data, separators=(',', ':'))};
+</script>
+{scripts('contas_fixas.js')}
 </body>
 </html>
 """
 
-with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-    f.write(html)
-
-print(f"Generated {OUTPUT_FILE}")
+if write_if_changed(OUTPUT_FILE, html):
+    print(f"Generated {OUTPUT_FILE}")
+else:
+    print(f"Unchanged {OUTPUT_FILE}")
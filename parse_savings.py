@@ -1,7 +1,11 @@
 import os
-import re
 import datetime
 import subprocess
+from money import format_cents
+from savings import SavingsIndex
+from outputs import write_if_changed
+from assets import stylesheets, scripts
+from export import export_dataset
 
 # Configuration
 directory = 'SCTBNK'
@@ -13,34 +17,7 @@ def convert_pdf_to_text(pdf_path):
     subprocess.run(['pdftotext', '-layout', pdf_path, text_path], check=True)
     return text_path
 
-def parse_scotia_statement(txt_file):
-    with open(txt_file, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
-    
-    # Extract Date Range (e.g., October 1 to December 31, 2025)
-    date_match = re.search(r'([A-Za-z]+ \d+ to [A-Za-z]+ \d+, \d{4})', content)
-    period = date_match.group(1) if date_match else "Unknown Period"
-    
-    # Extract Accounts
-    # Regex: 54.23% #000000135057263 SSI TFSA 10,008.28 10,195.18
-    # We want the END value (Dec 31)
-    accounts = []
-    
-    # Adjusted regex based on correct column alignment (percentage might vary)
-    # Looking for: #Number SSI Type StartVal EndVal
-    pattern = re.compile(r'#(\d+)\s+SSI\s+([A-Z]+)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})')
-    
-    for match in pattern.finditer(content):
-        acc_num, acc_type, start_val, end_val = match.groups()
-        accounts.append({
-            'account': acc_num,
-            'type': acc_type,
-            'value': float(end_val.replace(',', ''))
-        })
-        
-    return period, accounts
-
-data = []
+index = SavingsIndex(directory)
 if os.path.exists(directory):
     for filename in os.listdir(directory):
         if filename.endswith(".pdf"):
@@ -52,13 +29,21 @@ if os.path.exists(directory):
                     convert_pdf_to_text(full_path)
                 except:
                     continue
-            
-            period, accounts = parse_scotia_statement(txt_path)
-            if accounts:
-                data.append({'file': filename, 'period': period, 'accounts': accounts})
 
-# Sort by period (simple string sort might not be enough, but okay for now)
-data.sort(key=lambda x: x['period'])
+    added, removed = index.update()
+    print(f"Savings index: {added} new statement(s), {removed} removed, {len(index.statements)} total")
+
+# Statements come out of the index ordered by period end date
+data = index.statements
+summary = index.summary()
+
+# Export balances (see export.py)
+export_dataset('savings_balances', lambda: (
+    {'period_start': datetime.date.fromisoformat(s['start']), 'period_end': datetime.date.fromisoformat(s['end']),
+     'account': acc['account'], 'type': acc['type'], 'start': acc['start'], 'end': acc['end'], 'file': s['file']}
+    for s in data for acc in s['accounts']
+), [('period_start', 'date'), ('period_end', 'date'), ('account', 'str'), ('type', 'str'),
+    ('start', 'int'), ('end', 'int')])
 
 # Generate HTML
 html = f"""
@@ -68,21 +53,7 @@ html = f"""
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Minhas Poupanças (Scotiabank)</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #eef2f3; padding: 20px; display: flex; justify-content: center; }}
-        .container {{ width: 100%; max-width: 800px; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); display: none; }}
-        .login-box {{ width: 100%; max-width: 400px; background: white; padding: 40px; border-radius: 10px; box-shadow: 0 4px 15px rgba(0,0,0,0.1); text-align: center; }}
-        h1 {{ color: #c0392b; }}
-        .statement {{ border: 1px solid #ddd; margin-bottom: 20px; padding: 15px; border-radius: 5px; }}
-        .statement h3 {{ margin-top: 0; color: #2c3e50; }}
-        .account-row {{ display: flex; justify-content: space-between; border-bottom: 1px solid #eee; padding: 8px 0; }}
-        .account-row:last-child {{ border-bottom: none; }}
-        .total-row {{ display: flex; justify-content: space-between; font-weight: bold; margin-top: 10px; padding-top: 10px; border-top: 2px solid #ddd; color: #27ae60; }}
-        input {{ padding: 10px; width: 80%; margin-bottom: 15px; border: 1px solid #ddd; border-radius: 5px; }}
-        button {{ padding: 10px 20px; background: #c0392b; color: white; border: none; border-radius: 5px; cursor: pointer; font-weight: bold; }}
-        button:hover {{ background: #a93226; }}
-        .back-link {{ display: block; margin-bottom: 20px; color: #3498db; text-decoration: none; }}
-    </style>
+    {stylesheets('common.css', 'poupanca.css')}
 </head>
 <body>
 
@@ -100,6 +71,28 @@ html = f"""
         <h1>Minhas Poupanças (Scotiabank)</h1>
 """
 
+if summary:
+    html += """
+        <h3>Evolução por Conta</h3>
+        <table class="series-table">
+            <tr><th>Conta</th><th>Desde</th><th>Saldo Inicial</th><th>Saldo Atual</th><th>Crescimento</th><th>Aportes (est.)</th></tr>
+    """
+    for row in summary:
+        since = datetime.date.fromisoformat(row['since']).strftime('%d/%m/%Y')
+        html += f"""
+            <tr>
+                <td>{row['type']} (...{row['account'][-4:]})</td>
+                <td>{since}</td>
+                <td>CAD$ {format_cents(row['first'])}</td>
+                <td>CAD$ {format_cents(row['last'])}</td>
+                <td>CAD$ {format_cents(row['growth'])}</td>
+                <td>CAD$ {format_cents(row['contributions'])}</td>
+            </tr>
+        """
+    html += """
+        </table>
+    """
+
 for item in data:
     html += f"""
         <div class="statement">
@@ -110,15 +103,15 @@ for item in data:
         html += f"""
             <div class="account-row">
                 <span>{acc['type']} (...{acc['account'][-4:]})</span>
-                <span>CAD$ {acc['value']:,.2f}</span>
+                <span>CAD$ {format_cents(acc['end'])}</span>
             </div>
         """
-        total += acc['value']
+        total += acc['end']
     
     html += f"""
             <div class="total-row">
                 <span>Total</span>
-                <span>CAD$ {total:,.2f}</span>
+                <span>CAD$ {format_cents(total)}</span>
             </div>
         </div>
     """
@@ -127,29 +120,14 @@ html += f"""
     </div>
 
     <script>
-        function checkPassword() {{
-            const pwd = document.getElementById('password').value;
-            if (pwd === '{password_protect}') {{
-                document.getElementById('login-overlay').style.display = 'none';
-                document.getElementById('content').style.display = 'block';
-                document.body.style.background = '#f4f4f9'; // Restore normal background
-            }} else {{
-                document.getElementById('error-msg').style.display = 'block';
-            }}
-        }}
-        
-        // Allow Enter key
-        document.getElementById('password').addEventListener('keypress', function (e) {{
-            if (e.key === 'Enter') {{
-                checkPassword();
-            }}
-        }});
+        const SAVINGS_PASSWORD = '{password_protect}';
     </script>
+    {scripts('poupanca.js')}
 </body>
 </html>
 """
 
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write(html)
-
-print(f"Generated {output_file}")
+if write_if_changed(output_file, html):
+    print(f"Generated {output_file}")
+else:
+    print(f"Unchanged {output_file}")
@@ -0,0 +1,120 @@
+import datetime
+import os
+from money import format_cents, to_units
+from outputs import write_if_changed
+from assets import stylesheets, scripts
+from export import EXPORT_DIR, read_ndjson
+from timeline import CARD, FIXED, card_events, fixed_events, merge_timeline, summarize
+
+# Config
+OUTPUT_FILE = 'relatorio_fluxo.html'
+OPENING_BALANCE = 0 # Balance (cents, BRL) the running total starts from
+CARD_FILE = os.path.join(EXPORT_DIR, 'future_bills.ndjson') # Written by parse_expenses.py
+FIXED_FILE = os.path.join(EXPORT_DIR, 'fixed_bill_schedule.ndjson') # Written by parse_fixed_bills.py
+
+month_names = {
+    1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
+    7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'
+}
+
+def money_cell(amounts, extra=''):
+    # amounts: {'BRL': cents, 'CAD': cents}; currency.js shows the sum in the
+    # chosen currency, converting at the page's rate
+    brl, cad = amounts['BRL'], amounts['CAD']
+    if cad and brl:
+        text = f"R$ {format_cents(brl)} + CA$ {format_cents(cad)}"
+    elif cad:
+        text = f"CA$ {format_cents(cad)}"
+    else:
+        text = f"R$ {format_cents(brl)}"
+    return f'<td class="money{extra}" data-val="{to_units(brl)}" data-cad="{to_units(cad)}">{text}</td>'
+
+def combined(*amounts):
+    return {currency: sum(a[currency] for a in amounts) for currency in ('BRL', 'CAD')}
+
+streams = []
+if os.path.exists(CARD_FILE):
+    streams.append(card_events(read_ndjson(CARD_FILE, dates=('due_date',))))
+else:
+    print(f"Warning: {CARD_FILE} not found, run parse_expenses.py first")
+if os.path.exists(FIXED_FILE):
+    streams.append(fixed_events(read_ndjson(FIXED_FILE, dates=('due_date',))))
+else:
+    print(f"Warning: {FIXED_FILE} not found, run parse_fixed_bills.py first")
+
+today = datetime.date.today()
+timeline, weekly_totals, monthly_totals = summarize(merge_timeline(*streams), OPENING_BALANCE, today.replace(day=1))
+print(f"Timeline: {len(timeline)} payments, {len(monthly_totals)} months")
+
+# Generate HTML
+html = f"""
+<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Fluxo de Caixa Previsto</title>
+    {stylesheets('common.css', 'fluxo.css')}
+</head>
+<body>
+
+<div class="container">
+    <a href="relatorio_viagem.html" class="back-link">&larr; Voltar para Dashboard</a>
+    <h1>Fluxo de Caixa Previsto</h1>
+    <p class="small-text">Parcelas do cartão e contas fixas a partir de {today.replace(day=1).strftime('%d/%m/%Y')}. Contas fixas (em CAD) convertidas pela cotação abaixo.</p>
+
+    <div class="controls">
+        <label for="exchange-rate">Cotação (1 CAD = R$):</label>
+        <input type="number" id="exchange-rate" value="4.20" step="0.01" onchange="updateRate()">
+        <button class="currency-toggle" onclick="toggleCurrency()" id="btn-currency">Ver em CAD</button>
+    </div>
+
+    <h2>Por Mês</h2>
+    <table>
+        <tr><th>Mês</th><th>Cartão</th><th>Contas Fixas</th><th>Total</th></tr>
+"""
+
+for (year, month), totals in monthly_totals.items():
+    html += f"""
+        <tr><td>{month_names[month]}/{year}</td>{money_cell(totals[CARD])}{money_cell(totals[FIXED])}{money_cell(combined(totals[CARD], totals[FIXED]), ' total')}</tr>"""
+
+html += """
+    </table>
+
+    <h2>Por Semana</h2>
+    <table>
+        <tr><th>Semana</th><th>Início</th><th>Total</th></tr>
+"""
+
+for (year, week), total in weekly_totals.items():
+    monday = datetime.date.fromisocalendar(year, week, 1)
+    html += f"""
+        <tr><td>{week:02d}/{year}</td><td>{monday.strftime('%d/%m/%Y')}</td>{money_cell(total)}</tr>"""
+
+html += """
+    </table>
+
+    <h2>Pagamentos</h2>
+    <table>
+        <tr><th>Vencimento</th><th>Origem</th><th>Descrição</th><th>Detalhe</th><th>Valor</th><th>Saldo</th></tr>
+"""
+
+for event in timeline:
+    source_class = 'source-card' if event['source'] == CARD else 'source-fixed'
+    html += f"""
+        <tr><td>{event['date'].strftime('%d/%m/%Y')}</td><td><span class="source {source_class}">{event['source']}</span></td><td>{event['description']}</td><td class="small-text">{event['detail']}</td>{money_cell({'BRL': 0, 'CAD': 0, event['currency']: event['amount']})}{money_cell(event['balance'], ' balance')}</tr>"""
+
+html += f"""
+    </table>
+</div>
+
+{scripts('currency.js')}
+
+</body>
+</html>
+"""
+
+if write_if_changed(OUTPUT_FILE, html):
+    print(f"Generated {OUTPUT_FILE}")
+else:
+    print(f"Unchanged {OUTPUT_FILE}")
@@ -0,0 +1,74 @@
+import calendar
+import datetime
+import heapq
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+
+# Cash-flow projection for recurring bills.
+# A bill's whole future date series is generated at once from integer
+# arithmetic: day ordinals for bi-weekly bills, month indexes plus a cached
+# month-length table for monthly ones (so a payment on the 31st falls on the
+# last day of shorter months, and December rolls into January).
+
+FREQUENCY_DAYS = {'Weekly': 7, 'Bi-weekly': 14}
+
+@lru_cache(maxsize=None)
+def month_lengths(year):
+    return tuple(calendar.monthrange(year, month)[1] for month in range(1, 13))
+
+def month_date(index, day):
+    # index = year * 12 + month - 1; day is clamped to the month's end
+    year, month0 = divmod(index, 12)
+    return datetime.date(year, month0 + 1, min(day, month_lengths(year)[month0]))
+
+def project_dates(last_date, frequency, until):
+    # Every due date after last_date up to and including until
+    step = FREQUENCY_DAYS.get(frequency)
+    if step:
+        return [datetime.date.fromordinal(o)
+                for o in range(last_date.toordinal() + step, until.toordinal() + 1, step)]
+    if frequency == 'Monthly':
+        start = last_date.year * 12 + last_date.month
+        end = until.year * 12 + until.month - 1
+        dates = [month_date(i, last_date.day) for i in range(start, end + 1)]
+        if dates and dates[-1] > until:
+            dates.pop()
+        return dates
+    return []
+
+def next_due_date(last_date, frequency):
+    step = FREQUENCY_DAYS.get(frequency)
+    if step:
+        return last_date + datetime.timedelta(days=step)
+    if frequency == 'Monthly':
+        return month_date(last_date.year * 12 + last_date.month, last_date.day)
+    return last_date
+
+def horizon_end(start, months):
+    # Last day of the month `months - 1` months after start's month
+    index = start.year * 12 + start.month - 1 + months - 1
+    return month_date(index, 31)
+
+def project_bills(bills, start, months=12):
+    # bills: [{'name', 'frequency', 'last_date', 'amount' (cents)}]
+    # Returns the per-bill date series and, per (year, month), the expected
+    # outflow and number of payments
+    until = horizon_end(start, months)
+    series = {}
+    totals = defaultdict(int)
+    counts = defaultdict(int)
+    for bill in bills:
+        dates = [d for d in project_dates(bill['last_date'], bill['frequency'], until) if d >= start]
+        series[bill['name']] = dates
+        for d in dates:
+            totals[(d.year, d.month)] += bill['amount']
+            counts[(d.year, d.month)] += 1
+    return series, dict(sorted(totals.items())), counts
+
+def schedule_stream(bills, series):
+    # All projected payments as one stream ordered by due date
+    def payments(bill):
+        for d in series[bill['name']]:
+            yield {'bill': bill['name'], 'frequency': bill['frequency'], 'due_date': d, 'amount': bill['amount']}
+    return heapq.merge(*(payments(bill) for bill in bills), key=itemgetter('due_date'))
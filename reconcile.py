@@ -0,0 +1,81 @@
+import datetime
+import heapq
+import itertools
+from operator import itemgetter
+
+# Card invoice reconciliation.
+# Card charges are grouped into billing cycles keyed by their invoice due date
+# (the 19th). Invoice payments found in the bank statement are matched to the
+# cycles with a sorted-merge join: both sides are sorted by date once and
+# walked together, so the whole stage is O(n log n) in the number of rows.
+
+DUE_DAY = 19
+PAYMENT_WINDOW = (10, 10) # A payment counts for a due date up to N days before / after it
+
+RECONCILED = 'Conciliado'
+MISMATCH = 'Divergente'
+UNPAID = 'Sem pagamento'
+OPEN = 'Em aberto' # Not paid, but its payment window runs past the account statements
+UNMATCHED_PAYMENT = 'Pagamento sem fatura'
+
+def cycle_due_date(date, due_day=DUE_DAY):
+    # Charges up to the due day are billed on this month's invoice, later
+    # ones on next month's
+    if date.day <= due_day:
+        return date.replace(day=due_day)
+    year, month = divmod(date.year * 12 + date.month, 12)
+    return datetime.date(year, month + 1, due_day)
+
+def billing_cycles(charges):
+    # charges: (due_date, cents) pairs -> [{due_date, card_total, charges}] by due date
+    cycles = []
+    for due_date, group in itertools.groupby(sorted(charges, key=itemgetter(0)), key=itemgetter(0)):
+        amounts = [amount for _, amount in group]
+        cycles.append({'due_date': due_date, 'card_total': sum(amounts), 'charges': len(amounts)})
+    return cycles
+
+def merge_cycles(*cycle_lists):
+    # Several billing_cycles()-shaped lists, each ordered by due date -> one,
+    # with the cycles that share a due date added together
+    merged = []
+    for cycle in heapq.merge(*cycle_lists, key=itemgetter('due_date')):
+        if merged and merged[-1]['due_date'] == cycle['due_date']:
+            merged[-1]['card_total'] += cycle['card_total']
+            merged[-1]['charges'] += cycle['charges']
+        else:
+            merged.append(dict(cycle))
+    return merged
+
+def reconcile(cycles, payments, covered_until=None, window=PAYMENT_WINDOW):
+    # cycles: billing_cycles() output; payments: (date, cents) pairs;
+    # covered_until: last day the account statements cover (None: no
+    # statement). Returns one row per cycle plus one per payment that fits no
+    # cycle. A cycle is only unpaid once the statements cover its whole window.
+    before, after = (datetime.timedelta(days=days) for days in window)
+    rows = [dict(cycle, paid=0, payment_dates=[]) for cycle in cycles]
+    unmatched = []
+
+    i = 0
+    for date, amount in sorted(payments):
+        # Cycles whose window closed before this payment can't take it (or
+        # any later one)
+        while i < len(rows) and rows[i]['due_date'] + after < date:
+            i += 1
+        if i < len(rows) and rows[i]['due_date'] - before <= date:
+            rows[i]['paid'] += amount
+            rows[i]['payment_dates'].append(date)
+        else:
+            unmatched.append({'due_date': None, 'card_total': 0, 'charges': 0,
+                              'paid': amount, 'payment_dates': [date]})
+
+    for row in rows:
+        row['gap'] = row['paid'] - row['card_total']
+        if not row['payment_dates']:
+            covered = covered_until is not None and row['due_date'] + after <= covered_until
+            row['status'] = UNPAID if covered else OPEN
+        else:
+            row['status'] = RECONCILED if row['gap'] == 0 else MISMATCH
+    for row in unmatched:
+        row['gap'] = row['paid']
+        row['status'] = UNMATCHED_PAYMENT
+    return rows + unmatched
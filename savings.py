@@ -0,0 +1,188 @@
+import bisect
+import datetime
+import json
+import os
+import re
+from statistics import median
+from money import decimal_to_cents
+from formats import detect_format
+from outputs import atomic_writer
+
+# Savings time-series engine for Scotia statements.
+# Every parsed statement is appended as one JSON line to an index file, so a
+# run only parses statements that are new (or changed) since the last one.
+# Statements whose file is gone are dropped, and the index is rewritten with
+# one line per statement whenever a line was superseded or dropped, so it
+# grows with the statements, not with the runs.
+# In memory the statements are kept ordered by period end date.
+
+INDEX_FILENAME = 'savings_index.jsonl'
+
+MONTHS = {name: i for i, name in enumerate([
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'], 1)}
+
+# "October 1 to December 31, 2025" or "December 1, 2025 to February 28, 2026"
+period_pattern = re.compile(r'([A-Za-z]+) (\d+)(?:, (\d{4}))? to ([A-Za-z]+) (\d+), (\d{4})')
+account_pattern = re.compile(r'#(\d+)\s+SSI\s+([A-Z]+)\s+([\d,]+\.\d{2})\s+([\d,]+\.\d{2})')
+
+def parse_period(text):
+    match = period_pattern.search(text)
+    if not match:
+        return None
+    start_month, start_day, start_year, end_month, end_day, end_year = match.groups()
+    try:
+        end = datetime.date(int(end_year), MONTHS[end_month.lower()], int(end_day))
+        start_m = MONTHS[start_month.lower()]
+        year = int(start_year) if start_year else (end.year - 1 if start_m > end.month else end.year)
+        start = datetime.date(year, start_m, int(start_day))
+    except (KeyError, ValueError):
+        return None
+    return match.group(0), start, end
+
+def parse_scotia_statement(txt_file):
+    with open(txt_file, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+
+    period = parse_period(content)
+
+    # Regex: 54.23% #000000135057263 SSI TFSA 10,008.28 10,195.18
+    # Looking for: #Number SSI Type StartVal EndVal
+    accounts = []
+    for match in account_pattern.finditer(content):
+        acc_num, acc_type, start_val, end_val = match.groups()
+        accounts.append({
+            'account': acc_num,
+            'type': acc_type,
+            'start': decimal_to_cents(start_val),
+            'end': decimal_to_cents(end_val)
+        })
+
+    return period, accounts
+
+def file_fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def sort_key(statement):
+    return (statement['end'], statement['file'])
+
+class SavingsIndex:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_FILENAME)
+        self.statements = [] # Ordered by period end
+        self.by_file = {}
+        self.stale_lines = 0 # Index lines superseded by a later one
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._insert(json.loads(line))
+
+    def _insert(self, statement):
+        # Later lines win when a statement file was re-parsed
+        old = self.by_file.get(statement['file'])
+        if old is not None:
+            self.statements.remove(old)
+            self.stale_lines += 1
+        self.by_file[statement['file']] = statement
+        bisect.insort(self.statements, statement, key=sort_key)
+
+    def append(self, statement):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(statement, ensure_ascii=False) + '\n')
+        self._insert(statement)
+
+    def remove(self, filename):
+        self.statements.remove(self.by_file.pop(filename))
+
+    def compact(self):
+        with atomic_writer(self.path, 'w', encoding='utf-8') as f:
+            for statement in self.statements:
+                f.write(json.dumps(statement, ensure_ascii=False) + '\n')
+        self.stale_lines = 0
+
+    def is_current(self, filename, fingerprint):
+        statement = self.by_file.get(filename)
+        return statement is not None and statement['fingerprint'] == fingerprint
+
+    def update(self):
+        # Parse only statements that are not indexed yet (or changed on disk)
+        # and drop the ones whose file was deleted or renamed.
+        # Returns (added, removed).
+        added = 0
+        if not os.path.isdir(self.directory):
+            return added, 0
+        filenames = sorted(os.listdir(self.directory))
+        for filename in filenames:
+            if not filename.endswith('.txt'):
+                continue
+            path = os.path.join(self.directory, filename)
+            fingerprint = file_fingerprint(path)
+            if self.is_current(filename, fingerprint):
+                continue
+            if detect_format(path) != 'scotia_savings':
+                continue
+            period, accounts = parse_scotia_statement(path)
+            if not period or not accounts:
+                print(f"Warning: skipping {path} (period or accounts not found).")
+                continue
+            label, start, end = period
+            self.append({
+                'file': filename,
+                'fingerprint': fingerprint,
+                'period': label,
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'accounts': accounts
+            })
+            added += 1
+
+        removed = self.by_file.keys() - set(filenames)
+        for filename in removed:
+            self.remove(filename)
+        if removed or self.stale_lines:
+            self.compact()
+        return added, len(removed)
+
+    def account_series(self):
+        # account -> [(period start, period end, start cents, end cents)], in period order
+        series = {}
+        for statement in self.statements:
+            for acc in statement['accounts']:
+                series.setdefault(acc['account'], []).append(
+                    (statement['start'], statement['end'], acc['start'], acc['end']))
+        return series
+
+    def account_types(self):
+        return {acc['account']: acc['type'] for s in self.statements for acc in s['accounts']}
+
+    def baseline_return(self):
+        # Median period return over all account-periods. The median ignores the
+        # large jumps caused by deposits, so it approximates the market return.
+        rates = [(acc['end'] - acc['start']) / acc['start']
+                 for s in self.statements for acc in s['accounts'] if acc['start'] > 0]
+        return median(rates) if rates else 0.0
+
+    def summary(self):
+        # Per account: first/last balance, growth and an estimate of how much of
+        # that growth came from contributions rather than returns.
+        rate = self.baseline_return()
+        types = self.account_types()
+        rows = []
+        for account, points in self.account_series().items():
+            first_start, last_end = points[0][2], points[-1][3]
+            contributions = sum((end - start) - round(start * rate) for _, _, start, end in points)
+            rows.append({
+                'account': account,
+                'type': types[account],
+                'since': points[0][0],
+                'until': points[-1][1],
+                'statements': len(points),
+                'first': first_start,
+                'last': last_end,
+                'growth': last_end - first_start,
+                'contributions': contributions
+            })
+        return rows
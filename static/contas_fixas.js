@@ -0,0 +1,32 @@
+// Payment history lists. `BILL_HISTORY` is embedded by
+// relatorio_contas_fixas.html as {list id: [[days since 1970-01-01, cents], ...]},
+// newest first; each list is only built the first time it is opened.
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function formatDay(days) {
+    const date = new Date(days * DAY_MS);
+    const pad = n => String(n).padStart(2, '0');
+    return `${pad(date.getUTCDate())}/${pad(date.getUTCMonth() + 1)}/${date.getUTCFullYear()}`;
+}
+
+function formatCents(cents) {
+    return (cents / 100).toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+}
+
+function buildHistory(list) {
+    const fragment = document.createDocumentFragment();
+    BILL_HISTORY[list.id].forEach(([days, cents]) => {
+        const item = document.createElement('div');
+        item.className = 'history-item';
+        item.innerHTML = `<span>${formatDay(days)}</span><span>CAD$ ${formatCents(cents)}</span>`;
+        fragment.appendChild(item);
+    });
+    list.appendChild(fragment);
+    list.dataset.loaded = 'true';
+}
+
+function toggleHistory(id) {
+    const list = document.getElementById(id);
+    if (!list.dataset.loaded) buildHistory(list);
+    list.style.display = list.style.display === 'block' ? 'none' : 'block';
+}
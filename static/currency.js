@@ -0,0 +1,56 @@
+// Shared BRL/CAD display logic for the report pages.
+// Elements with class "money" carry their BRL value in data-val, plus an
+// optional CAD part in data-cad (amounts that are in CAD to begin with).
+let currentCurrency = localStorage.getItem('currency') || 'BRL';
+let exchangeRate = parseFloat(localStorage.getItem('exchangeRate')) || 4.20;
+const currencyListeners = [];
+
+// Pages that render money themselves (e.g. tables) register here
+function onCurrencyChange(listener) {
+    currencyListeners.push(listener);
+}
+
+function refreshPrices() {
+    currencyListeners.forEach(listener => listener());
+    updatePrices();
+}
+
+function updateRate() {
+    exchangeRate = parseFloat(document.getElementById('exchange-rate').value);
+    localStorage.setItem('exchangeRate', exchangeRate);
+    refreshPrices();
+}
+
+function toggleCurrency() {
+    currentCurrency = currentCurrency === 'BRL' ? 'CAD' : 'BRL';
+    localStorage.setItem('currency', currentCurrency);
+    updateButtonLabel();
+    refreshPrices();
+}
+
+function updateButtonLabel() {
+    const btn = document.getElementById('btn-currency');
+    btn.textContent = currentCurrency === 'BRL' ? 'Ver em CAD' : 'Ver em BRL';
+}
+
+function formatCurrency(value) {
+    if (currentCurrency === 'CAD') {
+        return (value / exchangeRate).toLocaleString('en-CA', { style: 'currency', currency: 'CAD' });
+    }
+    return value.toLocaleString('pt-BR', { style: 'currency', currency: 'BRL' });
+}
+
+function updatePrices() {
+    const elements = document.querySelectorAll('.money');
+    elements.forEach(el => {
+        const val = parseFloat(el.getAttribute('data-val'));
+        const cad = parseFloat(el.getAttribute('data-cad')) || 0;
+        el.textContent = formatCurrency(val + cad * exchangeRate);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.getElementById('exchange-rate').value = exchangeRate;
+    updateButtonLabel();
+    refreshPrices();
+});
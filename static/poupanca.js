@@ -0,0 +1,18 @@
+// SAVINGS_PASSWORD is defined inline by relatorio_poupanca.html
+function checkPassword() {
+    const pwd = document.getElementById('password').value;
+    if (pwd === SAVINGS_PASSWORD) {
+        document.getElementById('login-overlay').style.display = 'none';
+        document.getElementById('content').style.display = 'block';
+        document.body.style.background = '#f4f4f9'; // Restore normal background
+    } else {
+        document.getElementById('error-msg').style.display = 'block';
+    }
+}
+
+// Allow Enter key
+document.getElementById('password').addEventListener('keypress', function (e) {
+    if (e.key === 'Enter') {
+        checkPassword();
+    }
+});
@@ -0,0 +1,204 @@
+// Trip expenses table. `transactions` is embedded by relatorio_viagem.html
+// (or null, see API Mode below).
+let sortField = 'date';
+let sortDir = 'asc';
+
+// Init: the table re-renders whenever the currency or rate changes
+onCurrencyChange(renderTable);
+document.addEventListener('DOMContentLoaded', initPaidStatus); // Load Saved Paid Status
+
+// --- Paid Status Logic ---
+function initPaidStatus() {
+    document.querySelectorAll('.clickable-card').forEach(card => {
+        const id = card.id;
+        const savedStatus = localStorage.getItem('status-' + id);
+
+        if (id === 'invoice-2026-1' && savedStatus === null) { // Default Jan to paid
+            markAsPaid(card, true);
+            return;
+        }
+
+        if (savedStatus === 'true') {
+            markAsPaid(card, true);
+        } else {
+            markAsPaid(card, false);
+        }
+    });
+}
+
+function togglePaid(card) {
+    const isPaid = card.classList.contains('paid');
+    markAsPaid(card, !isPaid);
+}
+
+function markAsPaid(card, paid) {
+    const statusText = card.querySelector('.status-text');
+    if (paid) {
+        card.classList.add('paid');
+        statusText.textContent = 'PAGO';
+        localStorage.setItem('status-' + card.id, 'true');
+    } else {
+        card.classList.remove('paid');
+        statusText.textContent = 'Aberto';
+        localStorage.setItem('status-' + card.id, 'false');
+    }
+}
+// -------------------------
+
+function sortTable(field) {
+    if (sortField === field) {
+        sortDir = sortDir === 'asc' ? 'desc' : 'asc';
+    } else {
+        sortField = field;
+        sortDir = 'asc';
+    }
+    renderTable();
+}
+
+function renderTable() {
+    if (API_MODE) {
+        renderFromApi();
+        return;
+    }
+
+    const tbody = document.querySelector('#expenses-table tbody');
+    const showFatura = document.getElementById('toggle-fatura').checked;
+    const searchDesc = document.getElementById('search-desc').value.toLowerCase();
+    const filterType = document.getElementById('filter-type').value;
+
+    tbody.innerHTML = '';
+
+    let filtered = transactions.filter(tx => {
+        if (!showFatura && tx.type === 'Pagamento Fatura') return false;
+        if (searchDesc && !tx.description.toLowerCase().includes(searchDesc)) return false;
+        if (filterType !== 'all' && tx.type !== filterType) return false;
+        return true;
+    });
+
+    filtered.sort((a, b) => {
+        let valA = a[sortField];
+        let valB = b[sortField];
+        if (typeof valA === 'string') { valA = valA.toLowerCase(); valB = valB.toLowerCase(); }
+        if (valA < valB) return sortDir === 'asc' ? -1 : 1;
+        if (valA > valB) return sortDir === 'asc' ? 1 : -1;
+        return 0;
+    });
+
+    let totalPix = 0;
+    let totalDebito = 0;
+    let totalComprometido = 0;
+
+    filtered.forEach(tx => {
+        if (tx.type === 'Pix') {
+            totalPix += tx.value;
+            totalComprometido += tx.value;
+        }
+        else if (tx.type === 'Debito') {
+            totalDebito += tx.value;
+            totalComprometido += tx.value;
+        }
+        else if (tx.type === 'Credito') {
+            totalComprometido += tx.total_purchase_value;
+        }
+        // Pagamento Fatura is not added to any of these main cards, it's just tracked as 'paid'
+        // The value of 'totalCredito' card was removed as it's replaced by the monthly cards
+
+        appendRow(tbody, tx);
+    });
+
+    updateSummary(totalPix, totalDebito, totalComprometido);
+}
+
+function appendRow(tbody, tx) {
+    const row = document.createElement('tr');
+    const typeClass = tx.type.replace(' ', '-'); 
+    const totalDisplay = (tx.type === 'Credito' && tx.total_purchase_value > tx.value) 
+                        ? `<strong>${formatCurrency(tx.total_purchase_value)}</strong>` 
+                        : '-';
+
+    row.innerHTML = `
+        <td>${tx.display_date}</td>
+        <td>${tx.description}</td>
+        <td><span class="badge ${typeClass}">${tx.type}</span></td>
+        <td>${tx.category}</td>
+        <td>${tx.status}</td>
+        <td>${formatCurrency(tx.value)}</td>
+        <td style="color:#555;">${totalDisplay}</td>
+    `;
+    tbody.appendChild(row);
+}
+
+// Update Dynamic Summary Cards
+function updateSummary(totalPix, totalDebito, totalComprometido) {
+    document.getElementById('total-pix').textContent = formatCurrency(totalPix);
+    document.getElementById('total-debito').textContent = formatCurrency(totalDebito);
+    document.getElementById('total-comprometido').textContent = formatCurrency(totalComprometido);
+}
+
+// --- API Mode ---
+// Pages built with EMBED_TRANSACTIONS = False carry no data: rows come from
+// api.py one page at a time (cursor pagination) and the summary cards from
+// its /aggregate endpoint, using the same filters.
+const API_MODE = transactions === null;
+let apiRows = [];
+let nextCursor = null;
+let apiRequest = 0; // Responses from superseded requests are dropped
+
+function apiParams() {
+    const params = new URLSearchParams();
+    const searchDesc = document.getElementById('search-desc').value;
+    const filterType = document.getElementById('filter-type').value;
+    if (searchDesc) params.set('q', searchDesc);
+    if (filterType !== 'all') params.set('type', filterType);
+    if (!document.getElementById('toggle-fatura').checked) params.set('exclude', 'Pagamento Fatura');
+    return params;
+}
+
+async function fetchJson(path, params) {
+    const response = await fetch(`${path}?${params}`);
+    if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+    return response.json();
+}
+
+async function renderFromApi() {
+    const request = ++apiRequest;
+    const params = apiParams();
+    const [page, byType] = await Promise.all([
+        fetchPage(params),
+        fetchJson('/aggregate', new URLSearchParams([...params, ['by', 'type']])),
+    ]);
+    if (request !== apiRequest) return;
+
+    const totals = Object.fromEntries(byType.map(group => [group.type, group]));
+    const pix = totals['Pix'] ? totals['Pix'].value : 0;
+    const debito = totals['Debito'] ? totals['Debito'].value : 0;
+    const credito = totals['Credito'] ? totals['Credito'].total_purchase_value : 0;
+    updateSummary(pix, debito, pix + debito + credito);
+
+    apiRows = [];
+    showPage(page);
+}
+
+function fetchPage(params, cursor) {
+    params = new URLSearchParams(params);
+    params.set('sort', sortField);
+    params.set('order', sortDir);
+    if (cursor) params.set('cursor', cursor);
+    return fetchJson('/transactions', params);
+}
+
+async function loadMore() {
+    const request = apiRequest;
+    const page = await fetchPage(apiParams(), nextCursor);
+    if (request === apiRequest) showPage(page);
+}
+
+function showPage(page) {
+    apiRows = apiRows.concat(page.items);
+    nextCursor = page.next_cursor;
+
+    const tbody = document.querySelector('#expenses-table tbody');
+    tbody.innerHTML = '';
+    apiRows.forEach(tx => appendRow(tbody, tx));
+    document.getElementById('load-more').style.display = nextCursor ? 'inline-block' : 'none';
+}
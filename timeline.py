@@ -0,0 +1,51 @@
+import heapq
+from collections import defaultdict
+from operator import itemgetter
+
+# Unified cash-flow timeline.
+# Card installments (BRL) and projected fixed bills (CAD) both arrive already
+# ordered by due date, so they are merged lazily with a heap instead of being
+# concatenated and sorted. A single pass over the merged stream yields the
+# running balance and the per-week and per-month totals.
+# Amounts stay in their own currency: every total is a {'BRL': cents,
+# 'CAD': cents} pair, and the page converts with the rate the user picks.
+
+CARD = 'Cartão'
+FIXED = 'Conta Fixa'
+
+def zero():
+    return {'BRL': 0, 'CAD': 0}
+
+def card_events(rows):
+    # rows: future_bills export, ordered by due_date
+    for row in rows:
+        yield {'date': row['due_date'], 'source': CARD, 'description': row['description'],
+               'detail': row['installment_info'], 'amount': row['value'], 'currency': 'BRL'}
+
+def fixed_events(rows):
+    # rows: fixed_bill_schedule export, ordered by due_date; amounts in CAD cents
+    for row in rows:
+        yield {'date': row['due_date'], 'source': FIXED, 'description': row['bill'],
+               'detail': row['frequency'], 'amount': row['amount'], 'currency': 'CAD'}
+
+def merge_timeline(*streams):
+    return heapq.merge(*streams, key=itemgetter('date'))
+
+def summarize(events, opening_balance=0, start=None):
+    # Returns (events with their running balance, weekly totals, monthly totals).
+    # Weeks are keyed by ISO (year, week); months by (year, month) and split
+    # per source. opening_balance is in BRL cents.
+    timeline = []
+    weekly = defaultdict(zero)
+    monthly = defaultdict(lambda: {CARD: zero(), FIXED: zero()})
+    balance = {'BRL': opening_balance, 'CAD': 0}
+    for event in events:
+        date = event['date']
+        if start and date < start:
+            continue
+        amount, currency = event['amount'], event['currency']
+        balance[currency] -= amount
+        timeline.append(dict(event, balance=dict(balance)))
+        weekly[date.isocalendar()[:2]][currency] += amount
+        monthly[(date.year, date.month)][event['source']][currency] += amount
+    return timeline, dict(weekly), dict(monthly)